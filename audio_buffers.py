@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+In-memory audio buffers for the capture -> upload -> playback path
+"""
+
+import os
+import wave
+import tempfile
+
+TMPFS_DIR = "/dev/shm"
+SPILL_THRESHOLD = 2 * 1024 * 1024  # Bytes kept in RAM before spilling to tmpfs
+
+
+def new_audio_buffer(spill_threshold=SPILL_THRESHOLD):
+    """File-like buffer held in memory, spilling to tmpfs when it grows large
+
+    Nothing ever touches the SD card: without a tmpfs mount the buffer
+    simply stays in memory.
+    """
+    if not os.path.isdir(TMPFS_DIR):
+        spill_threshold = 0  # 0 means never roll over
+    return tempfile.SpooledTemporaryFile(max_size=spill_threshold, dir=TMPFS_DIR)
+
+
+def frames_to_wav(frames, channels, sample_width, rate):
+    """Wrap raw PCM frames in a WAV header; returns a buffer rewound to 0"""
+    buffer = new_audio_buffer()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(rate)
+        wf.writeframes(b''.join(frames))
+    buffer.seek(0)
+    return buffer
+
+
+def buffer_size(buffer):
+    """Size of a buffer in bytes, leaving its position unchanged"""
+    position = buffer.tell()
+    size = buffer.seek(0, os.SEEK_END)
+    buffer.seek(position)
+    return size
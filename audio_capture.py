@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Always-open microphone capture feeding a shared PCM ring buffer
+"""
+
+import time
+import threading
+import pyaudio
+
+
+class PCMRingBuffer:
+    """Single-producer ring of raw PCM bytes with independent reader cursors
+
+    Positions are absolute byte counts since the buffer was created. The
+    producer copies data in and only then publishes the new write position,
+    so readers never take a lock to copy audio out. The condition variable is
+    used purely to wake readers that are waiting for more data.
+    """
+
+    def __init__(self, capacity_bytes):
+        self.capacity = capacity_bytes
+        self._buffer = bytearray(capacity_bytes)
+        self._view = memoryview(self._buffer)
+        self.write_pos = 0
+        self.dropped_bytes = 0  # Skipped by readers the producer lapped
+        self.closed = False
+        self._data_ready = threading.Condition()
+
+    def write(self, data):
+        """Append PCM bytes (called from the capture callback only)"""
+        data = memoryview(data)
+        size = len(data)
+        if size > self.capacity:
+            data = data[size - self.capacity:]
+            self.write_pos += size - self.capacity
+            size = self.capacity
+
+        start = self.write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < size:
+            self._view[:size - first] = data[first:]
+
+        self.write_pos += size
+        with self._data_ready:
+            self._data_ready.notify_all()
+
+    def oldest_pos(self):
+        """Oldest position still held in the ring"""
+        return max(0, self.write_pos - self.capacity)
+
+    def read_at(self, pos, size):
+        """Copy `size` bytes starting at absolute position `pos`"""
+        start = pos % self.capacity
+        first = min(size, self.capacity - start)
+        data = bytes(self._view[start:start + first])
+        if first < size:
+            data += bytes(self._view[:size - first])
+        return data
+
+    def wait_for(self, pos, timeout):
+        """Block until `pos` has been written or `timeout` expires"""
+        with self._data_ready:
+            return self._data_ready.wait_for(
+                lambda: self.write_pos >= pos or self.closed, timeout
+            ) and self.write_pos >= pos
+
+    def close(self):
+        """Wake every waiting reader and refuse further waits"""
+        self.closed = True
+        with self._data_ready:
+            self._data_ready.notify_all()
+
+
+class RingReader:
+    """Cursor over a PCMRingBuffer that returns fixed-size frames"""
+
+    def __init__(self, ring, start_pos, sample_width):
+        self.ring = ring
+        self.position = start_pos
+        self.sample_width = sample_width
+
+    def read(self, num_samples, timeout=1.0):
+        """Return the next `num_samples` samples, or None on timeout"""
+        size = num_samples * self.sample_width
+        if not self.ring.wait_for(self.position + size, timeout):
+            return None
+
+        # Skip ahead if the producer lapped us while we were busy
+        if self.position < self.ring.oldest_pos():
+            self.ring.dropped_bytes += self.ring.oldest_pos() - self.position
+            self.position = self.ring.oldest_pos()
+
+        data = self.ring.read_at(self.position, size)
+        self.position += size
+        return data
+
+    def available(self):
+        """Number of samples ready to read without blocking"""
+        return (self.ring.write_pos - self.position) // self.sample_width
+
+
+class AudioCaptureStream:
+    """One callback-mode PyAudio input stream shared by every consumer
+
+    The stream stays open for the lifetime of the device, so wake word
+    detection and recording never pay for reopening ALSA, and a recorder can
+    start from audio captured before it was created.
+
+    A watchdog thread counts input overflows reported by the callback and
+    reopens the stream if no audio has arrived for `stall_seconds`; the ring
+    and its readers carry on across the reopen.
+    """
+
+    def __init__(self, audio, rate=16000, channels=1, format=pyaudio.paInt16,
+                 frames_per_buffer=512, buffer_seconds=10.0, stall_seconds=2.0):
+        self.audio = audio
+        self.rate = rate
+        self.channels = channels
+        self.format = format
+        self.frames_per_buffer = frames_per_buffer
+        self.sample_width = audio.get_sample_size(format) * channels
+
+        capacity = int(rate * buffer_seconds) * self.sample_width
+        self.ring = PCMRingBuffer(capacity)
+        self.stream = None
+        self.lock = threading.Lock()  # Guards opening and closing the stream
+
+        self.stall_seconds = stall_seconds
+        self.last_write = None  # time.monotonic() of the newest callback
+        self.overflows = 0  # Callbacks flagged paInputOverflow (audio lost in ALSA)
+        self.last_overflow_time = None  # time.time()
+        self.stalls = 0  # Reopens after the callback stopped arriving
+        self.last_stall_time = None
+        self.stop_event = threading.Event()
+        self.watchdog = None
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        """PyAudio capture callback: push the block into the ring"""
+        if status & pyaudio.paInputOverflow:
+            self.overflows += 1
+            self.last_overflow_time = time.time()
+        self.ring.write(in_data)
+        self.last_write = time.monotonic()
+        return (None, pyaudio.paContinue)
+
+    def start(self):
+        """Open and start the capture stream and its watchdog"""
+        if self.stream:
+            return
+
+        self._open()
+        self.watchdog = threading.Thread(target=self._watch, daemon=True)
+        self.watchdog.start()
+        print("✓ Audio capture stream running")
+
+    def _open(self):
+        self.last_write = time.monotonic()
+        self.stream = self.audio.open(
+            format=self.format,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._callback
+        )
+        self.stream.start_stream()
+
+    def _close_stream(self):
+        if self.stream:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception as e:
+                print(f"⚠️  Capture close error: {e}")
+            self.stream = None
+
+    def _watch(self):
+        """Report overflows and reopen the stream when the callback stalls"""
+        reported = 0
+        while not self.stop_event.wait(self.stall_seconds / 2):
+            if self.overflows > reported:
+                print(f"⚠️  {self.overflows - reported} capture overflow(s), audio was dropped")
+                reported = self.overflows
+
+            silent_for = time.monotonic() - self.last_write
+            if silent_for < self.stall_seconds:
+                continue
+            self.stalls += 1
+            self.last_stall_time = time.time()
+            print(f"⚠️  Capture stalled for {silent_for:.1f}s, reopening stream")
+            with self.lock:
+                if self.stop_event.is_set():
+                    return
+                self._close_stream()
+                try:
+                    self._open()
+                    print("✓ Audio capture stream reopened")
+                except Exception as e:
+                    # Try again on the next check
+                    print(f"✗ Could not reopen capture stream: {e}")
+
+    @property
+    def position(self):
+        """Current write position, usable as a reader start point"""
+        return self.ring.write_pos
+
+    def reader(self, start=None, preroll_ms=0):
+        """Create a reader at `start` (default: now), rewound by `preroll_ms`"""
+        if start is None:
+            start = self.ring.write_pos
+
+        preroll = int(self.rate * preroll_ms / 1000) * self.sample_width
+        start = max(start - preroll, self.ring.oldest_pos())
+        return RingReader(self.ring, start, self.sample_width)
+
+    def close(self):
+        """Stop the stream and release waiting readers"""
+        self.stop_event.set()
+        self.ring.close()
+        with self.lock:
+            self._close_stream()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Upload codecs for device -> backend audio
+"""
+
+from audio_buffers import new_audio_buffer, frames_to_wav
+
+try:
+    import numpy as np
+    import soundfile as sf
+except ImportError:  # Encoding falls back to plain WAV
+    np = None
+    sf = None
+
+# codec -> (soundfile format, subtype, upload filename, MIME type)
+UPLOAD_CODECS = {
+    "wav": ("WAV", "PCM_16", "recording.wav", "audio/wav"),
+    "flac": ("FLAC", "PCM_16", "recording.flac", "audio/flac"),
+    "opus": ("OGG", "OPUS", "recording.ogg", "audio/ogg"),
+}
+
+# Lossless FLAC when bandwidth is fine, low-bitrate Opus on weak Wi-Fi/GSM
+LINK_QUALITY_CODECS = {
+    "good": "flac",
+    "poor": "opus",
+}
+
+OPUS_COMPRESSION_LEVEL = 0.9  # 0.0 = highest bitrate, 1.0 = lowest
+
+
+def codec_for_link(link_quality):
+    """Pick the upload codec for a link-quality setting"""
+    return LINK_QUALITY_CODECS.get(link_quality, "flac")
+
+
+def encode_upload(frames, channels, sample_width, rate, codec="flac"):
+    """Encode raw PCM frames for upload
+
+    Returns (buffer, filename, mimetype) with the buffer rewound to 0. Falls
+    back to WAV when soundfile (libsndfile) is unavailable or cannot encode.
+    """
+    if codec != "wav" and sf is not None and sample_width == 2:
+        file_format, subtype, filename, mimetype = UPLOAD_CODECS[codec]
+        samples = np.frombuffer(b''.join(frames), dtype='<i2').reshape(-1, channels)
+
+        options = {}
+        if subtype == "OPUS":
+            options["compression_level"] = OPUS_COMPRESSION_LEVEL
+
+        buffer = new_audio_buffer()
+        try:
+            sf.write(buffer, samples, rate, format=file_format, subtype=subtype, **options)
+            buffer.seek(0)
+            return buffer, filename, mimetype
+        except Exception as e:
+            buffer.close()
+            print(f"⚠️  {codec} encoding failed, sending WAV: {e}")
+
+    _, _, filename, mimetype = UPLOAD_CODECS["wav"]
+    return frames_to_wav(frames, channels, sample_width, rate), filename, mimetype
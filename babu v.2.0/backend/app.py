@@ -1,7 +1,7 @@
 # app.py
 # Entry point for Flask REST API backend for Raspberry Pi AI Nepali Companion
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, url_for
 import random
 import json
 
@@ -63,14 +63,30 @@ from speech_recognition import Recognizer, AudioFile
 from pydub import AudioSegment
 import io
 
+# Compressed device uploads (FLAC / Ogg Opus) are decoded in-process with
+# libsndfile instead of shelling out to ffmpeg through pydub
+import soundfile as sf
+
+SOUNDFILE_EXTENSIONS = ('.flac', '.ogg', '.opus')
+
+def decode_to_wav(audio_data):
+    samples, samplerate = sf.read(io.BytesIO(audio_data), dtype='int16')
+    wav_io = io.BytesIO()
+    sf.write(wav_io, samples, samplerate, format='WAV', subtype='PCM_16')
+    wav_io.seek(0)
+    return wav_io
+
 def transcribe_audio(audio_file):
     recognizer = Recognizer()
     # Convert to wav if necessary (SpeechRecognition prefers wav/pcm)
     audio_file.seek(0)
     audio_data = audio_file.read()
     audio_file.seek(0)
-    # If not wav, convert using pydub
-    if not audio_file.filename.lower().endswith('.wav'):
+    filename = audio_file.filename.lower()
+    if filename.endswith(SOUNDFILE_EXTENSIONS):
+        audio_source = AudioFile(decode_to_wav(audio_data))
+    # Other non-wav formats are converted using pydub
+    elif not filename.endswith('.wav'):
         audio = AudioSegment.from_file(io.BytesIO(audio_data))
         wav_io = io.BytesIO()
         audio.export(wav_io, format="wav")
@@ -288,7 +304,47 @@ def synthesize_edge_tts(text, output_wav):
 def audio_to_speech():
     if 'audio' not in request.files:
         return jsonify({'error': 'No audio file uploaded'}), 400
-    audio_file = request.files['audio']
+    return respond_to_audio(request.files['audio'])
+
+# Streaming upload: the device sends raw 16-bit PCM with chunked transfer
+# encoding while the user is still speaking. The WAV is assembled in memory as
+# chunks arrive, so transcription starts as soon as the last chunk lands.
+import wave
+from werkzeug.datastructures import FileStorage
+
+STREAM_READ_BYTES = 4096
+
+@app.route('/audio/stream', methods=['POST'])
+def audio_stream_to_speech():
+    sample_rate = request.headers.get('X-Sample-Rate', 16000, type=int)
+    channels = request.headers.get('X-Channels', 1, type=int)
+    sample_width = request.headers.get('X-Sample-Width', 2, type=int)
+
+    wav_io = io.BytesIO()
+    received = 0
+    with wave.open(wav_io, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(sample_rate)
+        while True:
+            chunk = request.stream.read(STREAM_READ_BYTES)
+            if not chunk:
+                break
+            wf.writeframes(chunk)
+            received += len(chunk)
+
+    if not received:
+        return jsonify({'error': 'No audio streamed'}), 400
+    print(f"[DEBUG] Streamed upload complete: {received} bytes")
+
+    wav_io.seek(0)
+    return respond_to_audio(FileStorage(stream=wav_io, filename='stream.wav', content_type='audio/wav'))
+
+def play_url(audio_filename):
+    """Playback URL on whichever host the device reached us at"""
+    return url_for('play_audio', filename=audio_filename, _external=True)
+
+def respond_to_audio(audio_file):
     try:
         # 1. Transcribe Nepali audio
         try:
@@ -304,7 +360,7 @@ def audio_to_speech():
             audio_filename = f"{uuid.uuid4().hex}.wav"
             audio_path = os.path.join(OUTPUTS_DIR, audio_filename)
             synthesize_edge_tts(default_text, audio_path)
-            full_play_url = f"http://172.19.218.78:5000/api/play_audio/{audio_filename}"
+            full_play_url = play_url(audio_filename)
             return jsonify({
                 'intent': 'no_speech',
                 'transcribed_text': nepali_text,
@@ -321,7 +377,7 @@ def audio_to_speech():
             audio_filename = f"{uuid.uuid4().hex}.wav"
             audio_path = os.path.join(OUTPUTS_DIR, audio_filename)
             synthesize_edge_tts(news_response, audio_path)
-            full_play_url = f"http://172.19.218.78:5000/api/play_audio/{audio_filename}"
+            full_play_url = play_url(audio_filename)
             return jsonify({
                 'intent': 'news',
                 'transcribed_text': nepali_text,
@@ -373,7 +429,7 @@ def audio_to_speech():
             synthesize_edge_tts(nepali_date_response, audio_path)
             
             # Generate full play URL
-            full_play_url = f"http://172.19.218.78:5000/api/play_audio/{audio_filename}"
+            full_play_url = play_url(audio_filename)
             
             return jsonify({
                 'intent': detected_intent,
@@ -393,7 +449,7 @@ def audio_to_speech():
             synthesize_edge_tts(news_response, audio_path)
             
             # Generate full play URL
-            full_play_url = f"http://172.19.218.78:5000/api/play_audio/{audio_filename}"
+            full_play_url = play_url(audio_filename)
             
             return jsonify({
                 'intent': detected_intent,
@@ -419,7 +475,7 @@ def audio_to_speech():
             synthesize_edge_tts(response_text, audio_path)
             
             # Generate full play URL
-            full_play_url = f"http://172.19.218.78:5000/api/play_audio/{audio_filename}"
+            full_play_url = play_url(audio_filename)
             
             return jsonify({
                 'intent': detected_intent,
@@ -444,7 +500,7 @@ def audio_to_speech():
         synthesize_edge_tts(response_text, audio_path)
         
         # 6. Generate full play URL
-        full_play_url = f"http://172.19.218.78:5000/api/play_audio/{audio_filename}"
+        full_play_url = play_url(audio_filename)
         
         # 7. Return JSON response with intent and full play URL
         return jsonify({
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Health-probed pool of backend hosts with failover and optional hedging
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+
+from http_session import ConnectionWarmer
+
+
+class BackendEndpoint:
+    """One backend base URL and what probes and requests have seen of it"""
+
+    LATENCY_SMOOTHING = 0.3  # Weight of the newest sample in the latency EWMA
+    FAILURES_TO_EJECT = 2  # Consecutive failures before a host counts as down
+
+    def __init__(self, session, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.latency = None  # Smoothed seconds, None until first measured
+        self.failures = 0
+        self.warmer = ConnectionWarmer(session, self.base_url + '/')
+
+    @property
+    def healthy(self):
+        return self.failures < self.FAILURES_TO_EJECT
+
+    def succeeded(self, seconds=None):
+        self.failures = 0
+        if seconds is not None:
+            if self.latency is None:
+                self.latency = seconds
+            else:
+                self.latency += self.LATENCY_SMOOTHING * (seconds - self.latency)
+
+    def failed(self):
+        self.failures += 1
+
+    def __repr__(self):
+        latency = f"{self.latency * 1000:.0f}ms" if self.latency is not None else "?"
+        return f"{self.base_url} ({'up' if self.healthy else 'down'}, {latency})"
+
+
+class BackendPool:
+    """Routes backend calls to the fastest healthy host
+
+    A background thread GETs each host's health route ("/") every
+    PROBE_INTERVAL seconds and keeps a smoothed round-trip time. Requests go
+    to the healthy host with the lowest latency; on a connection error or a
+    5xx they fail over to the next one. With hedge_after set, a replayable
+    request that hasn't answered in that many seconds is also sent to the
+    runner-up and whichever answers first wins; one that fails sooner fails
+    over at once.
+    """
+
+    PROBE_INTERVAL = 15.0
+    PROBE_TIMEOUT = (2, 3)
+
+    def __init__(self, session, base_urls, hedge_after=None):
+        self.session = session
+        self.endpoints = [BackendEndpoint(session, url) for url in base_urls]
+        self.hedge_after = hedge_after
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.probe_thread = None
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="backend-hedge")
+
+    def start(self):
+        """Probe every host now and then periodically; a single host is never probed"""
+        if len(self.endpoints) < 2 or self.probe_thread:
+            return
+        self.probe_thread = threading.Thread(target=self._probe_loop, daemon=True)
+        self.probe_thread.start()
+
+    def close(self):
+        self.stop_event.set()
+        if self.probe_thread:
+            self.probe_thread.join(timeout=1.0)
+        self.executor.shutdown(wait=False)
+
+    def ranked(self):
+        """Endpoints best first: fewest recent failures, then lowest latency"""
+        with self.lock:
+            return sorted(self.endpoints, key=lambda e: (
+                e.failures,
+                e.latency if e.latency is not None else float('inf'),
+            ))
+
+    def best(self):
+        return self.ranked()[0]
+
+    def warm(self):
+        """Open a connection to the host the next request will use"""
+        self.best().warmer.warm()
+
+    def post(self, path, replayable=True, **kwargs):
+        """POST to the best host, failing over (and hedging) to the others
+
+        Pass replayable=False when the body can only be sent once (a
+        generator); such requests go to the best host alone.
+        """
+        candidates = self.ranked()
+        if replayable and self.hedge_after and len(candidates) > 1:
+            return self._hedged(candidates, path, kwargs)
+
+        error = None
+        for endpoint in candidates:
+            try:
+                response = self.send(endpoint, path, **kwargs)
+                if response.status_code < 500:
+                    return response
+                error = None
+            except requests.exceptions.ReadTimeout:
+                raise  # Slow rather than down; the caller's retry policy decides
+            except Exception as e:
+                error = e
+            if not replayable:
+                break  # Body was consumed; it can't be sent elsewhere
+        if error:
+            raise error
+        return response
+
+    def send(self, endpoint, path, **kwargs):
+        """POST to one host and record the outcome against it"""
+        started = time.monotonic()
+        try:
+            response = self.session.post(endpoint.base_url + path, **kwargs)
+        except Exception:
+            self._record(endpoint, ok=False)
+            raise
+        # Full request time includes the backend's work, so only health probes
+        # feed the latency estimate
+        self._record(endpoint, ok=response.status_code < 500)
+        if response.status_code >= 500:
+            print(f"⚠️  {endpoint.base_url} answered {response.status_code} after "
+                  f"{time.monotonic() - started:.1f}s")
+        return response
+
+    def _hedged(self, candidates, path, kwargs):
+        """Race the best host against the next one once it fails or is slow
+
+        A connection error or 5xx fails over to the next host at once, as in
+        post(); a host still silent after hedge_after seconds is hedged once.
+        A read timeout is slow rather than down, so it never fails over.
+        """
+        remaining = list(candidates)
+        futures = {}
+
+        def launch():
+            endpoint = remaining.pop(0)
+            futures[self.executor.submit(self.send, endpoint, path, **kwargs)] = endpoint
+
+        launch()
+        hedge_at = time.monotonic() + self.hedge_after
+        result = None
+        while futures:
+            timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at and remaining else None
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"⏩ No answer from {candidates[0].base_url} yet, hedging to {remaining[0].base_url}")
+                launch()
+                hedge_at = None
+                continue
+
+            for future in done:
+                endpoint = futures.pop(future)
+                try:
+                    response = future.result()
+                except requests.exceptions.ReadTimeout as e:
+                    result = e
+                    continue
+                except Exception as e:
+                    result = e
+                else:
+                    if response.status_code < 500:
+                        return response  # A slower request finishes unobserved
+                    result = response
+                if remaining:
+                    print(f"⏩ {endpoint.base_url} failed, failing over to {remaining[0].base_url}")
+                    launch()
+                    hedge_at = None
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _record(self, endpoint, ok, seconds=None):
+        with self.lock:
+            was_healthy = endpoint.healthy
+            if ok:
+                endpoint.succeeded(seconds)
+            else:
+                endpoint.failed()
+            if was_healthy != endpoint.healthy:
+                state = "back up" if endpoint.healthy else "down"
+                print(f"{'✓' if endpoint.healthy else '⚠️ '} Backend {endpoint.base_url} {state}")
+
+    def _probe_loop(self):
+        while not self.stop_event.is_set():
+            for endpoint in self.endpoints:
+                self._probe(endpoint)
+            self.stop_event.wait(self.PROBE_INTERVAL)
+
+    def _probe(self, endpoint):
+        started = time.monotonic()
+        try:
+            response = self.session.get(endpoint.base_url + '/', timeout=self.PROBE_TIMEOUT)
+            response.close()
+            self._record(endpoint, ok=response.status_code < 500, seconds=time.monotonic() - started)
+        except Exception:
+            self._record(endpoint, ok=False)
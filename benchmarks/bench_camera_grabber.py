@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: frame freshness with on-demand reads vs. the background grabber
+
+A ColorDetector is built on fake_camera.FakeVideoCapture, which queues
+frames the way V4L2 does: the oldest few are kept until someone reads them.
+The old validation pattern is replayed: the camera opens, the user gets 2 s
+to position the pouch, then three frames are taken 1 s apart. A fourth
+frame, the verification photo, is taken right after the last vote. This is
+done twice:
+
+- on-demand: cap.read() for each frame, as before;
+- grabber: ColorDetector._read_frame(), i.e. FrameGrabber.latest().
+
+For each frame the benchmark reports how old it was (now minus its capture
+time) and how long the call blocked. It then pauses the grabber for 2 s and
+checks that the first frame after resume is fresh, not one the driver queued.
+
+Usage:
+    python benchmarks/bench_camera_grabber.py [--fps 15] [--buffers 4]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_camera
+
+POSITIONING_S = 2.0
+VOTE_GAP_S = 1.0
+
+
+def timed(read):
+    """(frame age s, call s) for one read"""
+    started = time.monotonic()
+    frame = read()
+    done = time.monotonic()
+    return done - fake_camera.capture_time(frame), done - started
+
+
+def replay(read):
+    """Positioning pause, three votes a second apart, then the verification photo"""
+    time.sleep(POSITIONING_S)
+    samples = []
+    for _ in range(3):
+        samples.append(timed(read))
+        time.sleep(VOTE_GAP_S)
+    samples.append(timed(read))
+    return samples
+
+
+def report(name, samples):
+    ages = ", ".join(f"{age * 1000:4.0f}" for age, _ in samples)
+    worst_call = max(call for _, call in samples)
+    print(f"{name:10s} frame age ms [{ages}]   longest call {worst_call * 1000:5.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Camera grabber freshness benchmark")
+    parser.add_argument('--fps', type=int, default=15, help='Camera frame rate')
+    parser.add_argument('--buffers', type=int, default=4, help='Frames the fake driver queues')
+    args = parser.parse_args()
+
+    frame = fake_camera.pouch_frame('blue', np.random.default_rng(0))
+
+    def open_camera(index):
+        camera = fake_camera.FakeVideoCapture(frame, fps=args.fps, buffers=args.buffers)
+        camera.set = lambda prop, value: True  # Keep the queue depth under test
+        return camera
+
+    cv2.VideoCapture = open_camera
+    from color_detection import ColorDetector
+
+    print(f"{args.fps} fps camera, {args.buffers} driver buffers; "
+          f"{POSITIONING_S:.0f}s positioning, 3 votes {VOTE_GAP_S:.0f}s apart, then the photo")
+
+    detector = ColorDetector()
+    detector.grabber.stop()  # Read on demand, like before the grabber
+    report("on-demand", replay(lambda: detector.cap.read()[1]))
+    detector.cap.release()
+
+    detector = ColorDetector()
+    report("grabber", replay(detector._read_frame))
+
+    detector.pause()
+    time.sleep(POSITIONING_S)
+    age, call = timed(detector._read_frame)
+    print(f"after a {POSITIONING_S:.0f}s pause: frame age {age * 1000:.0f} ms, call {call * 1000:.1f} ms, "
+          f"{detector.grabber.sequence} frames grabbed in total")
+    detector.cleanup()
+
+
+if __name__ == "__main__":
+    main()
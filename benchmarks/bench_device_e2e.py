@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark: headless end-to-end runs of AssistiveVoiceDevice
+
+Each scenario runs the device core (conversation only) in its own
+process, using the fakes from fake_device.py: a scripted microphone, a
+wake-tone Porcupine, pygame's dummy (null) audio driver and a local stub
+backend. The device goes through a few full conversations. For each
+scenario the benchmark reports wake-to-first-audio latency from the
+device's own latency traces, plus CPU time per conversation, peak RSS and
+the audio health counters (capture overflows and stalls, playback
+underruns), and flags any stage whose duration from the previous mark came
+out negative. With --inject-stall the capture stream is wedged after the
+first conversation, and the rest only succeed if the device reopens it.
+
+The microphone plays synthesized speech over Gaussian noise by default.
+--question-wav plays a recorded question instead (or, given a directory,
+each .wav in it in turn), and --mic-wav loops a room recording as the
+background; both are 16-bit WAVs, converted to 16 kHz mono. The wake word
+is always the tone the fake Porcupine listens for. No microphone,
+Porcupine key, speaker or camera is needed, so this runs in CI.
+
+Usage:
+    python benchmarks/bench_device_e2e.py [--scenario NAME] [--conversations 3]
+        [--backend-ms 1200] [--download-kbps 0] [--inject-stall]
+        [--mic-wav ROOM.wav] [--question-wav QUESTION.wav|DIR] [--verbose]
+"""
+
+import os
+import sys
+import json
+import math
+import glob
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# name -> (BABU_LINK_QUALITY, reply format)
+SCENARIOS = {
+    "stream-wav": ("good", "wav"),    # Streaming PCM upload, streamed WAV reply
+    "upload-opus": ("poor", "wav"),   # One-shot Opus upload on a weak link
+    "mp3-reply": ("good", "mp3"),     # Reply the streaming player can't handle
+}
+
+RESULT_PREFIX = "RESULT "
+
+
+def find_mp3_reply():
+    """An MP3 reply from the backend's outputs, if the tree has one"""
+    pattern = os.path.join(REPO_DIR, "babu v.2.0", "backend", "outputs", "*")
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'rb') as f:
+            head = f.read(3)
+        if head == b'ID3' or head[:2] in (b'\xff\xfb', b'\xff\xf3'):
+            return path
+    return None
+
+
+def percentile(values, q):
+    """Nearest-rank percentile, None for no samples"""
+    values = sorted(values)
+    if not values:
+        return None
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def run_scenario(name, args):
+    """Child process: run the device through a few conversations"""
+    link_quality, reply_format = SCENARIOS[name]
+    sys.path.insert(0, REPO_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    import fake_device
+
+    workdir = tempfile.mkdtemp(prefix="babu-bench-")
+    os.chdir(workdir)
+    os.makedirs("sound")
+    for cue, freq, seconds in (("start.wav", 880, 0.25), ("waiting.wav", 440, 1.0),
+                               ("ending.wav", 660, 0.3), ("error.wav", 220, 0.4),
+                               ("medication_reminder.wav", 550, 0.5)):
+        fake_device.tone_wav(os.path.join("sound", cue), freq, seconds)
+
+    if reply_format == "mp3":
+        mp3 = find_mp3_reply()
+        if not mp3:
+            print(RESULT_PREFIX + json.dumps({"skipped": "no MP3 reply in backend/outputs"}))
+            return
+        with open(mp3, 'rb') as f:
+            reply = f.read()
+    else:
+        reply = fake_device.reply_wav()
+
+    backend = fake_device.StubBackend(
+        reply, processing_ms=args.backend_ms, download_kbps=args.download_kbps or None
+    ).start()
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ["BABU_LINK_QUALITY"] = link_quality
+    os.environ["BABU_BACKEND_URLS"] = backend.base_url
+    os.environ["BABU_METRICS_FILE"] = os.path.join(workdir, "metrics", "latency.jsonl")
+    os.environ["BABU_METRICS_PORT"] = "0"
+
+    questions = fake_device.load_wavs(args.question_wav) if args.question_wav else fake_device.synth_question()
+    background = fake_device.load_wav(args.mic_wav) if args.mic_wav else None
+    mic = fake_device.ScriptedMicrophone(questions, background=background)
+    fake_device.install_fakes(mic)
+
+    import device_core
+
+    setup_usage = resource.getrusage(resource.RUSAGE_SELF)
+    # No camera or reminders in this benchmark
+    device = device_core.AssistiveVoiceDevice(features=("conversation",))
+    fake_device.prompt_while_listening(device, mic, idle_seconds=1.0)
+
+    traces = []
+    record = device.metrics.record
+
+    def record_and_count(trace):
+        record(trace)
+        traces.append(trace)
+        if args.inject_stall and len(traces) == 1:
+            mic.break_stream()
+        if len(traces) >= args.conversations:
+            device.is_running = False
+
+    device.metrics.record = record_and_count
+
+    start_usage = resource.getrusage(resource.RUSAGE_SELF)
+    device.run()
+    end_usage = resource.getrusage(resource.RUSAGE_SELF)
+    backend.stop()
+    os.chdir(REPO_DIR)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    cpu = (end_usage.ru_utime + end_usage.ru_stime) - (start_usage.ru_utime + start_usage.ru_stime)
+    setup_cpu = (start_usage.ru_utime + start_usage.ru_stime) - (setup_usage.ru_utime + setup_usage.ru_stime)
+    first_audio = [t.since_wake()["first_audio"] for t in traces if "first_audio" in t.since_wake()]
+    playback_end = [t.since_wake()["playback_end"] for t in traces if "playback_end" in t.since_wake()]
+    negative = sorted({stage for t in traces for stage, seconds in t.stage_durations().items() if seconds < 0})
+
+    print(RESULT_PREFIX + json.dumps({
+        "conversations": len(traces),
+        "ok": sum(t.ok for t in traces),
+        "first_audio_p50": percentile(first_audio, 0.5),
+        "first_audio_max": max(first_audio) if first_audio else None,
+        "playback_end_p50": percentile(playback_end, 0.5),
+        "cpu_per_conversation": cpu / max(1, len(traces)),
+        "setup_cpu": setup_cpu,
+        "peak_rss_mb": end_usage.ru_maxrss / 1024,
+        "backend_requests": backend.requests,
+        "overflows": device.capture.overflows if device.capture else 0,
+        "stalls": device.capture.stalls if device.capture else 0,
+        "underruns": device.response_player.total_underruns if device.response_player else 0,
+        "negative_stages": negative,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless device end-to-end benchmark")
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), help='Run one scenario (default: all)')
+    parser.add_argument('--conversations', type=int, default=3, help='Conversations per scenario')
+    parser.add_argument('--backend-ms', type=int, default=1200, help='Stub backend processing time')
+    parser.add_argument('--download-kbps', type=float, default=0, help='Throttle reply download (0 = unthrottled)')
+    parser.add_argument('--inject-stall', action='store_true', help='Wedge the capture stream after the first conversation')
+    parser.add_argument('--mic-wav', help='Room recording to loop as the microphone background (16-bit WAV)')
+    parser.add_argument('--question-wav', help='Spoken question WAV, or a directory of them asked in turn')
+    parser.add_argument('--verbose', action='store_true', help='Show device output')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_scenario(args.child, args)
+        return
+
+    names = [args.scenario] if args.scenario else list(SCENARIOS)
+    print(f"Backend {args.backend_ms} ms, {args.conversations} conversations per scenario")
+    print(f"{'scenario':12s} {'ok':>5s} {'1st audio p50':>14s} {'max':>7s} {'done p50':>9s} "
+          f"{'CPU/conv':>9s} {'peak RSS':>9s} {'ovf/stall/undr':>15s}")
+
+    for name in names:
+        command = [sys.executable, os.path.abspath(__file__), '--child', name,
+                   '--conversations', str(args.conversations),
+                   '--backend-ms', str(args.backend_ms),
+                   '--download-kbps', str(args.download_kbps)]
+        if args.inject_stall:
+            command.append('--inject-stall')
+        for option, path in (('--mic-wav', args.mic_wav), ('--question-wav', args.question_wav)):
+            if path:
+                command += [option, os.path.abspath(path)]
+        child = subprocess.run(command, capture_output=True, text=True, timeout=600)
+        if args.verbose:
+            print(child.stdout + child.stderr)
+
+        lines = [line for line in child.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+        if not lines:
+            print(f"{name:12s} ✗ failed (exit {child.returncode})")
+            print(child.stderr[-2000:])
+            continue
+
+        result = json.loads(lines[-1][len(RESULT_PREFIX):])
+        if "skipped" in result:
+            print(f"{name:12s} skipped: {result['skipped']}")
+            continue
+
+        def seconds(value):
+            return f"{value:.2f}s" if value is not None else "-"
+
+        print(f"{name:12s} {result['ok']:>2d}/{result['conversations']:<2d} "
+              f"{seconds(result['first_audio_p50']):>14s} {seconds(result['first_audio_max']):>7s} "
+              f"{seconds(result['playback_end_p50']):>9s} {result['cpu_per_conversation']:8.2f}s "
+              f"{result['peak_rss_mb']:7.1f}MB "
+              f"{result['overflows']:>7d}/{result['stalls']}/{result['underruns']}")
+        if result['negative_stages']:
+            print(f"{'':12s} ✗ negative stage durations: {', '.join(result['negative_stages'])}")
+
+
+if __name__ == "__main__":
+    main()
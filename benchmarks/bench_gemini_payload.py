@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Gemini color-check request size and encode time, old vs. new payload
+
+"Before" is the original ColorDetector._encode_base64: BGR to RGB, a PIL
+image, a 640×480 JPEG at quality 85, base64. "After" is
+color_detection.encode_pouch_image: the frame cropped to the local
+classifier's candidate regions (ColorDetector._pouch_roi, the whole frame
+when there are none), shrunk to GEMINI_IMAGE_MAX_SIDE and encoded with
+cv2.imencode. Both run on the synthetic frames of fake_camera.py on one
+thread. The benchmark reports the JSON request body per call and the encode
+time per frame, and the body of one batched request for GEMINI_BATCH frames
+against that many single-frame requests.
+
+Usage:
+    python benchmarks/bench_gemini_payload.py [--frames 40] [--rounds 5] [--threads 1]
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import base64
+import argparse
+import contextlib
+
+import cv2
+import numpy as np
+from PIL import Image
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_camera
+
+PROMPT = "Identify the most dominant color in this image."
+
+
+def encode_pil(frame):
+    """The original payload image: full frame, PIL JPEG quality 85"""
+    buffer = io.BytesIO()
+    Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def body_bytes(jpegs):
+    """Size of the JSON request body the detector would post"""
+    from color_detection import gemini_color_payload
+    return len(json.dumps(gemini_color_payload(jpegs, PROMPT)).encode())
+
+
+def encode_ms(encode, frames, rounds):
+    """Best of `rounds` passes, in ms per frame"""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for frame, roi in frames:
+            encode(frame, roi)
+        best = min(best, time.perf_counter() - started)
+    return best / len(frames) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemini payload benchmark")
+    parser.add_argument('--frames', type=int, default=40, help='Synthetic 640×480 frames')
+    parser.add_argument('--rounds', type=int, default=5, help='Passes over the frames (best is reported)')
+    parser.add_argument('--threads', type=int, default=1, help='OpenCV threads (0 = OpenCV default)')
+    args = parser.parse_args()
+
+    if args.threads:
+        cv2.setNumThreads(args.threads)
+    cv2.VideoCapture = lambda index: fake_camera.FakeVideoCapture(fake_camera.pouch_frame(None, np.random.default_rng(0)))
+    from color_detection import ColorDetector, GEMINI_BATCH, GEMINI_IMAGE_MAX_SIDE, encode_pouch_image
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector = ColorDetector()
+        detector.cleanup()
+    frames = []
+    for _, frame, _ in fake_camera.frame_set(args.frames):
+        detector.classifier.classify(frame)
+        frames.append((frame, detector._pouch_roi(frame.shape)))
+    cropped = sum(roi is not None for _, roi in frames)
+
+    before = [encode_pil(frame) for frame, _ in frames]
+    after = [encode_pouch_image(frame, roi) for frame, roi in frames]
+    before_ms = encode_ms(lambda frame, roi: base64.b64encode(encode_pil(frame)), frames, args.rounds)
+    after_ms = encode_ms(lambda frame, roi: base64.b64encode(encode_pouch_image(frame, roi)), frames, args.rounds)
+
+    before_call = np.mean([body_bytes([jpeg]) for jpeg in before])
+    after_call = np.mean([body_bytes([jpeg]) for jpeg in after])
+    batches = [after[start:start + GEMINI_BATCH] for start in range(0, len(after) - GEMINI_BATCH + 1, GEMINI_BATCH)]
+    batch_call = np.mean([body_bytes(batch) for batch in batches])
+    singles = np.mean([sum(body_bytes([jpeg]) for jpeg in batch) for batch in batches])
+
+    print(f"{len(frames)} frames 640×480 ({cropped} with candidate regions to crop to), "
+          f"{cv2.getNumThreads()} OpenCV thread(s)")
+    print(f"PIL, full frame, q85  {before_call / 1024:6.1f} KiB/call  {before_ms:5.2f} ms encode")
+    print(f"cv2, ROI ≤{GEMINI_IMAGE_MAX_SIDE}px, q80  {after_call / 1024:6.1f} KiB/call  {after_ms:5.2f} ms encode  "
+          f"(×{before_call / after_call:.1f} smaller, ×{before_ms / after_ms:.1f} faster)")
+    print(f"batch of {GEMINI_BATCH}: one request {batch_call / 1024:.1f} KiB vs. {GEMINI_BATCH} requests "
+          f"{singles / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compressed 24-hour memory soak of the device
+
+The device runs headless in a child process with the fakes from
+fake_device.py. Each simulated hour is one full conversation followed by an
+idle gap of listening. The memory budget's idle timeout is scaled down so
+that cues (and the camera, with --camera) really are released during each
+gap and reloaded by the next conversation. RSS is sampled throughout. The
+benchmark reports start, peak and final RSS, the growth per simulated hour
+over the second half of the run (a leak shows up here), how many releases
+happened, and whether the peak stayed within the budget.
+
+Usage:
+    python benchmarks/bench_memory_soak.py [--hours 24] [--gap 3] [--budget-mb 160]
+        [--camera] [--verbose]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+RESULT_PREFIX = "RESULT "
+SAMPLE_INTERVAL = 0.25
+
+
+def run_soak(args):
+    """Child process: run one conversation per simulated hour"""
+    sys.path.insert(0, REPO_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    import fake_device
+
+    workdir = tempfile.mkdtemp(prefix="babu-soak-")
+    os.chdir(workdir)
+    os.makedirs("sound")
+    for cue, freq, seconds in (("start.wav", 880, 0.25), ("waiting.wav", 440, 1.0),
+                               ("ending.wav", 660, 0.3), ("error.wav", 220, 0.4),
+                               ("medication_reminder.wav", 550, 0.5)):
+        fake_device.tone_wav(os.path.join("sound", cue), freq, seconds)
+
+    backend = fake_device.StubBackend(fake_device.reply_wav(), processing_ms=300).start()
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ["BABU_BACKEND_URLS"] = backend.base_url
+    os.environ["BABU_METRICS_FILE"] = os.path.join(workdir, "metrics", "latency.jsonl")
+    os.environ["BABU_METRICS_PORT"] = "0"
+    os.environ["BABU_MEMORY_BUDGET_MB"] = str(args.budget_mb)
+    # Released halfway through each idle gap
+    os.environ["BABU_MEMORY_IDLE_S"] = str(args.gap / 2)
+
+    mic = fake_device.ScriptedMicrophone(fake_device.synth_question())
+    fake_device.install_fakes(mic)
+
+    import device_core
+    import memory_budget
+
+    features = ("conversation", "camera") if args.camera else ("conversation",)
+    device = device_core.AssistiveVoiceDevice(features=features)
+    fake_device.prompt_while_listening(device, mic, idle_seconds=args.gap)
+    memory = device.memory
+    memory.check_interval = max(0.5, args.gap / 4)
+
+    samples = []  # (seconds since start, RSS bytes, conversations so far)
+    sessions = []
+    started = time.monotonic()
+    done = threading.Event()
+
+    def sampler():
+        while not done.wait(SAMPLE_INTERVAL):
+            samples.append((time.monotonic() - started, memory_budget.rss_bytes(), len(sessions)))
+
+    record = device.metrics.record
+
+    def record_and_count(trace):
+        record(trace)
+        sessions.append(trace.ok)
+        if args.camera:
+            device.feature("camera").get()  # A pouch check's worth of camera use
+        if len(sessions) >= args.hours:
+            device.is_running = False
+
+    device.metrics.record = record_and_count
+    threading.Thread(target=sampler, daemon=True).start()
+    device.run()
+    done.set()
+    backend.stop()
+    os.chdir(REPO_DIR)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    print(RESULT_PREFIX + json.dumps({
+        "sessions": len(sessions),
+        "ok": sum(sessions),
+        "samples": samples,
+        "releases": memory.releases,
+        "over_budget": memory.over_budget,
+        "budget_bytes": memory.budget_bytes,
+    }))
+
+
+def growth_per_hour(samples):
+    """Least-squares RSS slope (bytes per simulated hour) over the second half"""
+    points = [(hour, rss) for _, rss, hour in samples[len(samples) // 2:]]
+    if len(points) < 2 or points[0][0] == points[-1][0]:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return covariance / variance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed memory soak of the device")
+    parser.add_argument('--hours', type=int, default=24, help='Simulated hours (one conversation each)')
+    parser.add_argument('--gap', type=float, default=3.0, help='Real seconds of idle listening per hour')
+    parser.add_argument('--budget-mb', type=float, default=160, help='Memory budget (BABU_MEMORY_BUDGET_MB)')
+    parser.add_argument('--camera', action='store_true', help='Also open (and release) the camera each hour')
+    parser.add_argument('--verbose', action='store_true', help='Show device output')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_soak(args)
+        return
+
+    command = [sys.executable, os.path.abspath(__file__), '--child',
+               '--hours', str(args.hours), '--gap', str(args.gap), '--budget-mb', str(args.budget_mb)]
+    if args.camera:
+        command.append('--camera')
+    print(f"Soaking {args.hours} simulated hours ({args.gap:.1f}s idle each), budget {args.budget_mb:.0f} MB")
+    child = subprocess.run(command, capture_output=True, text=True, timeout=args.hours * 60 + 120)
+    if args.verbose:
+        print(child.stdout + child.stderr)
+
+    lines = [line for line in child.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+    if not lines:
+        print(f"✗ Soak failed (exit {child.returncode})")
+        print(child.stderr[-2000:])
+        sys.exit(1)
+    result = json.loads(lines[-1][len(RESULT_PREFIX):])
+
+    samples = result["samples"]
+    mb = 1024 * 1024
+    rss = [value for _, value, _ in samples]
+    peak = max(rss)
+    within = peak <= result["budget_bytes"]
+    releases = ", ".join(f"{name} ×{count}" for name, count in result["releases"].items()) or "none"
+
+    print(f"Conversations     {result['ok']}/{result['sessions']} ok")
+    print(f"RSS start         {rss[0] / mb:7.1f} MB")
+    print(f"RSS peak          {peak / mb:7.1f} MB")
+    print(f"RSS final         {rss[-1] / mb:7.1f} MB")
+    print(f"Growth (2nd half) {growth_per_hour(samples) / 1024:+7.1f} KB per simulated hour")
+    print(f"Releases          {releases}")
+    print(f"Over-budget checks {result['over_budget']}")
+    print(f"{'✓ Stayed within' if within else '✗ Exceeded'} the {result['budget_bytes'] / mb:.0f} MB budget")
+    if not within:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
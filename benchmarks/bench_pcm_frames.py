@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: PCM frame conversion cost in the wake word loop
+
+Compares the old per-sample int.from_bytes list against PCMFrameConverter
+and reports the CPU time each costs over an hour of idle listening, both
+for the conversion alone and with the unpack Porcupine does on every frame.
+
+Limitation: pvporcupine's Porcupine.process() copies its argument with
+(c_short * len(pcm))(*pcm), which boxes every sample whichever sequence it
+gets. PCMFrameConverter only removes the conversion in front of that; the
+"with Porcupine's unpack" rows replay the unpack with a ctypes stub (no
+pvporcupine needed) and are the realistic per-frame saving.
+
+Usage: python benchmarks/bench_pcm_frames.py [--frames 20000]
+"""
+
+import os
+import sys
+import time
+import argparse
+from ctypes import c_short
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pcm_frames import PCMFrameConverter
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 512  # Porcupine frame length
+
+
+def convert_legacy(pcm):
+    """Conversion used by detect_wake_word before PCMFrameConverter"""
+    return [int.from_bytes(pcm[i:i+2], byteorder='little', signed=True)
+            for i in range(0, len(pcm), 2)]
+
+
+def porcupine_unpack(pcm):
+    """What pvporcupine.Porcupine.process() does with the frame before the C call"""
+    return (c_short * len(pcm))(*pcm)
+
+
+def measure(convert, frames):
+    """Return CPU seconds spent converting every frame once"""
+    start = time.process_time()
+    for frame in frames:
+        convert(frame)
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PCM frame conversion benchmark")
+    parser.add_argument('--frames', type=int, default=20000, help='Frames to convert per run')
+    args = parser.parse_args()
+
+    # A handful of distinct frames so the conversion can't be cached
+    frames = [os.urandom(FRAME_LENGTH * 2) for _ in range(16)]
+    frames = [frames[i % len(frames)] for i in range(args.frames)]
+
+    converter = PCMFrameConverter(FRAME_LENGTH)
+    assert list(converter.convert(frames[0])) == convert_legacy(frames[0])
+
+    frames_per_hour = SAMPLE_RATE / FRAME_LENGTH * 3600
+    arms = (("int.from_bytes list", convert_legacy), ("PCMFrameConverter", converter.convert))
+
+    print(f"Frames converted: {args.frames} ({FRAME_LENGTH} samples each)")
+    for label, wrap in (("conversion only", lambda convert: convert),
+                        ("with Porcupine's unpack", lambda convert: lambda pcm: porcupine_unpack(convert(pcm)))):
+        print()
+        print(f"{label}:")
+        totals = []
+        for name, convert in arms:
+            total = measure(wrap(convert), frames)
+            totals.append(total)
+            per_frame = total / args.frames
+            print(f"  {name:22s} {per_frame * 1e6:8.2f} µs/frame  "
+                  f"{per_frame * frames_per_hour:8.2f} CPU s/hour")
+
+        legacy, current = totals
+        saved = (legacy - current) / args.frames * frames_per_hour
+        print(f"  CPU saved per hour of idle listening: {saved:.2f} s "
+              f"({legacy / max(current, 1e-9):.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
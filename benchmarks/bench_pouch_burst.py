@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to a pouch verdict, sequential votes vs. early-exit burst
+
+A ColorDetector runs on fake_camera.FakeVideoCapture showing a scripted
+scene. Each scenario is validated twice:
+
+- sequential: the old flow. The device waits 2 s, validate_pouch_color
+  waits another 2 s, then takes three votes with a 1 s sleep after each
+  (simulated with the same classifier, so only the waiting differs).
+- burst: the current validate_pouch_color, with no up-front wait.
+
+Gemini is faked. A call (of one frame or a batch) sleeps --gemini-s and
+returns the pouch color when one is in view, or "none" for the empty table,
+as the prompt asks. Frames the local classifier is unsure of go to it: with
+two pouches in view the burst waits for Gemini, and a white pouch in dim
+light, which looks grey to the local color ranges and has no candidate
+region, is named by Gemini alone. The benchmark reports the verdict, the
+total time and, for the burst, the Gemini requests made and each vote's
+capture-to-answer latency and confidence.
+
+Usage:
+    python benchmarks/bench_pouch_burst.py [--gemini-s 2.5] [--verbose]
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+
+import cv2
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_camera
+
+# name -> (expected color, color shown, seconds until the pouch is in view, light, decoy pouch)
+SCENARIOS = {
+    "in view": ("blue", "blue", 0.0, 1.0, None),
+    "arrives 1.5s": ("blue", "blue", 1.5, 1.0, None),
+    "arrives 4s": ("blue", "blue", 4.0, 1.0, None),
+    "wrong pouch": ("blue", "green", 0.0, 1.0, None),
+    "2 pouches (Gemini)": ("blue", "blue", 0.0, 1.0, "green"),
+    "dim white": ("white", "white", 0.0, 0.45, None),
+    "no pouch": ("blue", None, None, 1.0, None),
+}
+
+
+def scene(color, arrives, light, decoy):
+    """Frames over time: an empty table until the pouch arrives"""
+    rng = np.random.default_rng(5)
+    empty = fake_camera.pouch_frame(None, rng, light=light)
+    pouch = fake_camera.pouch_frame(color, rng, light=light, decoy=decoy) if color else empty
+    return lambda seconds: pouch if arrives is not None and seconds >= arrives else empty
+
+
+def fake_gemini(detector, shown, arrives, seconds):
+    """Gemini stand-in: slow, right about pouches, and answers none for an empty table"""
+    def detect(images):
+        detector.gemini_calls += 1
+        time.sleep(seconds)
+        return [shown if arrives is not None and fake_camera.capture_time(frame) - detector.cap.started >= arrives
+                else None for frame, _ in images]
+    return detect
+
+
+def sequential(detector, expected):
+    """The pre-burst flow: 2 s + 2 s of waiting, three votes 1 s apart"""
+    started = time.monotonic()
+    time.sleep(4.0)
+    votes = {}
+    for _ in range(3):
+        color = detector._classify_frame(detector._read_frame())["color"]
+        if color:
+            votes[color] = votes.get(color, 0) + 1
+        time.sleep(1.0)
+    detected = max(votes, key=votes.get) if votes else None
+    ok = detected == expected and votes[detected] / 3 >= 0.5
+    return ok, time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pouch validation burst benchmark")
+    parser.add_argument('--gemini-s', type=float, default=2.5, help='Seconds per faked Gemini call')
+    parser.add_argument('--verbose', action='store_true', help='Show detector output')
+    args = parser.parse_args()
+
+    from color_detection import ColorDetector
+
+    print(f"{'scenario':18s} {'sequential':>16s} {'burst':>16s} {'Gemini':>6s}  votes (color confidence latency)")
+    for name, (expected, shown, arrives, light, decoy) in SCENARIOS.items():
+        results = []
+        for mode in ("sequential", "burst"):
+            cv2.VideoCapture = lambda index: fake_camera.FakeVideoCapture(scene(shown, arrives, light, decoy))
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                detector = ColorDetector()
+                detector.gemini_api_key = "bench"
+                detector._detect_colors_gemini = fake_gemini(detector, shown, arrives, args.gemini_s)
+                if mode == "sequential":
+                    results.append(sequential(detector, expected))
+                else:
+                    started = time.monotonic()
+                    ok = detector.validate_pouch_color(expected)
+                    results.append((ok, time.monotonic() - started))
+                    burst = detector.last_burst
+                    calls = detector.gemini_calls
+                detector.cleanup()
+            if args.verbose:
+                print(output.getvalue())
+
+        def verdict(ok, seconds):
+            return f"{'pass' if ok else 'fail'} {seconds:5.2f}s"
+
+        def describe(vote):
+            confidence = "" if vote["confidence"] is None else f" {vote['confidence']:.2f}"
+            return f"{vote['color'] or '-'}{confidence} {vote['latency_s'] * 1000:.0f}ms"
+
+        votes = " ".join(describe(vote) for vote in burst["votes"])
+        print(f"{name:18s} {verdict(*results[0]):>16s} {verdict(*results[1]):>16s} {calls:>6d}  {votes}")
+
+
+if __name__ == "__main__":
+    main()
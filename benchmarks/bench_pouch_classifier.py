@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local pouch color classification vs. asking Gemini every time
+
+Runs PouchClassifier over synthetic 640×480 frames (fake_camera.py) in
+four conditions: a pouch in normal light, in dim light, among colored
+clutter, and an empty table. For each condition it reports how often the
+local answer was confident and right, how often a confident answer was
+wrong, and how often ColorDetector would fall back to Gemini. It also reports
+the time per local classification. A Gemini call is not made; its cost is
+taken as --gemini-s per call (default 2.5 s, typical for a 640×480 JPEG over
+the Pi's Wi-Fi) to estimate the time for a three-vote validation.
+
+Usage:
+    python benchmarks/bench_pouch_classifier.py [--frames 80] [--gemini-s 2.5]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_camera
+from pouch_classifier import PouchClassifier, POUCH_LOCAL_CONFIDENCE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local pouch classifier benchmark")
+    parser.add_argument('--frames', type=int, default=80, help='Synthetic frames (split across conditions)')
+    parser.add_argument('--gemini-s', type=float, default=2.5, help='Assumed seconds per Gemini call')
+    args = parser.parse_args()
+
+    classifier = PouchClassifier()
+    cases = fake_camera.frame_set(args.frames)
+    classifier.classify(cases[0][1])  # Warm up OpenCV
+
+    rows = {}
+    timings = []
+    for expected, frame, condition in cases:
+        started = time.perf_counter()
+        color, confidence = classifier.classify(frame)
+        timings.append(time.perf_counter() - started)
+
+        row = rows.setdefault(condition, {"frames": 0, "right": 0, "wrong": 0, "fallback": 0})
+        row["frames"] += 1
+        if color and confidence >= POUCH_LOCAL_CONFIDENCE:
+            row["right" if color == expected else "wrong"] += 1
+        else:
+            row["fallback"] += 1
+
+    timings.sort()
+    local_ms = timings[len(timings) // 2] * 1000
+    print(f"Local classifier: p50 {local_ms:.1f} ms, max {timings[-1] * 1000:.1f} ms per 640×480 frame "
+          f"(confidence threshold {POUCH_LOCAL_CONFIDENCE:.2f})")
+    print(f"{'condition':10s} {'frames':>6s} {'local ok':>9s} {'local wrong':>12s} {'to Gemini':>10s}")
+    for condition, row in rows.items():
+        print(f"{condition:10s} {row['frames']:6d} {row['right']:9d} {row['wrong']:12d} {row['fallback']:10d}")
+
+    total = sum(row["frames"] for row in rows.values())
+    fallback = sum(row["fallback"] for row in rows.values()) / total
+    tiered_s = 3 * (local_ms / 1000 + fallback * args.gemini_s)
+    print(f"Three-vote validation: Gemini only ≈ {3 * args.gemini_s:.1f}s and 3 calls, "
+          f"tiered ≈ {tiered_s:.2f}s and {3 * fallback:.1f} calls on average (excluding sleeps)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pouch classifier frames per second, per-color pipelines vs. single pass
+
+"Before" is the original MedicineAssistant.detect_pouch_color approach
+(with the same color ranges as PouchClassifier): for every color, inRange,
+close + open, findContours and a filled-contour pixel count. "After" is
+PouchClassifier: one lookup-table labelling pass, one close + open,
+connectedComponentsWithStats and vectorized shape scoring. Both run over
+the same synthetic 640×480 frames (fake_camera.py) on one thread, as on a
+Pi that is also running the wake word loop. The benchmark reports frames
+per second, how many frames each got right (an unsure answer is right
+only for an empty table) and how often the two agree.
+
+Usage:
+    python benchmarks/bench_pouch_fps.py [--frames 40] [--rounds 5] [--threads 1]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_camera
+from pouch_classifier import PouchClassifier, POUCH_LOCAL_CONFIDENCE
+
+
+class PerColorClassifier(PouchClassifier):
+    """The original five-pipeline classifier, for comparison"""
+
+    def classify(self, frame):
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        regions = {}
+        for color, ranges in self.COLOR_RANGES.items():
+            mask = cv2.inRange(hsv, np.array(ranges[0][0]), np.array(ranges[0][1]))
+            for lower, upper in ranges[1:]:
+                mask |= cv2.inRange(hsv, np.array(lower), np.array(upper))
+            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)
+            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+            region = self._best_contour_region(mask)
+            if region:
+                regions[color] = region
+
+        if not regions:
+            return None, 0.0
+        ranked = sorted(regions.items(), key=lambda item: item[1], reverse=True)
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return ranked[0][0], max(0.0, min(1.0, ranked[0][1] - 0.5 * runner_up))
+
+    def _best_contour_region(self, mask):
+        """Fit of the most pouch-shaped contour, or None"""
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        best_contour, best_score = None, 0
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area < self.MIN_AREA or area > mask.size * self.MAX_FRAME_SHARE:
+                continue
+            x, y, w, h = cv2.boundingRect(contour)
+            score = (min(area / 10000, 1.0) * 0.4 + (1.0 - abs(float(w) / h - 1.0)) * 0.3
+                     + float(area) / (w * h) * 0.3)
+            if score > best_score and score > self.MIN_SCORE:
+                best_contour, best_score = contour, score
+        if best_contour is None:
+            return None
+
+        roi_mask = np.zeros(mask.shape, dtype=np.uint8)
+        cv2.fillPoly(roi_mask, [best_contour], 255)
+        share = cv2.countNonZero(cv2.bitwise_and(mask, roi_mask)) / max(1, cv2.countNonZero(roi_mask))
+        return share * best_score if share > self.MIN_COLOR_SHARE else None
+
+
+def frames_per_second(classifier, frames, rounds):
+    """Best of `rounds` passes over the frames"""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for frame in frames:
+            classifier.classify(frame)
+        best = min(best, time.perf_counter() - started)
+    return len(frames) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pouch classifier fps benchmark")
+    parser.add_argument('--frames', type=int, default=40, help='Synthetic 640×480 frames')
+    parser.add_argument('--rounds', type=int, default=5, help='Passes over the frames (best is reported)')
+    parser.add_argument('--threads', type=int, default=1, help='OpenCV threads (0 = OpenCV default)')
+    args = parser.parse_args()
+
+    if args.threads:
+        cv2.setNumThreads(args.threads)
+    cases = fake_camera.frame_set(args.frames)
+    frames = [frame for _, frame, _ in cases]
+
+    before, after = PerColorClassifier(), PouchClassifier()
+    before_fps = frames_per_second(before, frames, args.rounds)
+    after_fps = frames_per_second(after, frames, args.rounds)
+
+    def answer(classifier, frame):
+        color, confidence = classifier.classify(frame)
+        return color if confidence >= POUCH_LOCAL_CONFIDENCE else None
+
+    agree = sum(answer(before, frame) == answer(after, frame) for frame in frames)
+    correct = [sum(answer(classifier, frame) == expected for expected, frame, _ in cases)
+               for classifier in (before, after)]
+
+    print(f"{len(frames)} frames 640×480, {cv2.getNumThreads()} OpenCV thread(s)")
+    print(f"per-color pipelines  {before_fps:7.1f} fps  ({1000 / before_fps:5.2f} ms/frame)  "
+          f"{correct[0]}/{len(frames)} correct")
+    print(f"single pass          {after_fps:7.1f} fps  ({1000 / after_fps:5.2f} ms/frame)  "
+          f"{correct[1]}/{len(frames)} correct")
+    print(f"speed-up ×{after_fps / before_fps:.2f}, same answer on {agree}/{len(frames)} frames")
+
+
+if __name__ == "__main__":
+    main()
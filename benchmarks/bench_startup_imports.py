@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: import cost and boot time of each device build
+
+For each entry point's feature set, a fresh interpreter imports
+device_core and builds the device (using the fakes from fake_device.py,
+so no microphone or Porcupine key is needed). The benchmark reports how long
+the import and the boot took, and which heavy modules were loaded by the time
+the device was listening. It also lists the most expensive top-level imports
+from `python -X importtime`. Separately, it times the deferred camera import
+(OpenCV), which a medication build pays on first pouch check.
+
+PyAudio and Porcupine are faked here, so their import cost is not counted;
+on a Pi Zero every number is several times larger.
+
+Usage:
+    python benchmarks/bench_startup_imports.py [--runs 3] [--top 8]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# Entry point -> features it builds the device with
+BUILDS = {
+    "hardware.py": ("conversation",),
+    "main.py": ("conversation", "medication", "camera"),
+}
+
+HEAVY_MODULES = ("numpy", "requests", "soundfile", "pygame", "cv2")
+
+RESULT_PREFIX = "RESULT "
+
+
+def run_child(features):
+    """Child process: import the core and boot one build"""
+    sys.path.insert(0, REPO_DIR)
+    sys.path.insert(0, BENCH_DIR)
+
+    # Timed first, so the fakes' own imports (numpy) aren't credited to it
+    started = time.perf_counter()
+    import device_core
+    imported = time.perf_counter()
+
+    import fake_device
+    workdir = tempfile.mkdtemp(prefix="babu-boot-")
+    os.chdir(workdir)
+    os.makedirs("sound")
+    for cue in ("start.wav", "waiting.wav", "ending.wav", "error.wav", "medication_reminder.wav"):
+        fake_device.tone_wav(os.path.join("sound", cue), 440, 0.3)
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ["BABU_METRICS_FILE"] = os.path.join(workdir, "metrics", "latency.jsonl")
+    os.environ["BABU_METRICS_PORT"] = "0"
+    fake_device.install_fakes(fake_device.ScriptedMicrophone(fake_device.synth_question()))
+
+    before_boot = time.perf_counter()
+    device = device_core.AssistiveVoiceDevice(features=features)
+    booted = time.perf_counter()
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    device.shutdown()
+
+    camera_import_s = None
+    if "camera" in features:
+        before = time.perf_counter()
+        import color_detection  # What the camera feature defers to first use
+        camera_import_s = time.perf_counter() - before
+
+    os.chdir(REPO_DIR)
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(RESULT_PREFIX + json.dumps({
+        "import_s": imported - started,
+        "boot_s": booted - before_boot,
+        "loaded": loaded,
+        "camera_import_s": camera_import_s,
+    }))
+
+
+def top_imports(importtime_log, count):
+    """Most expensive top-level imports from `-X importtime` output"""
+    costs = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # One space of indent = imported at top level
+            costs.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(costs, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Device import/boot benchmark")
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters per build (best is reported)')
+    parser.add_argument('--top', type=int, default=8, help='Top-level imports to list per build')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(tuple(args.child.split(",")))
+        return
+
+    for entry, features in BUILDS.items():
+        results = []
+        importtime_log = ""
+        for _ in range(args.runs):
+            command = [sys.executable, "-X", "importtime", os.path.abspath(__file__),
+                       "--child", ",".join(features)]
+            child = subprocess.run(command, capture_output=True, text=True, timeout=120)
+            lines = [line for line in child.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+            if not lines:
+                print(f"{entry}: ✗ failed (exit {child.returncode})")
+                print(child.stderr[-2000:])
+                break
+            results.append(json.loads(lines[-1][len(RESULT_PREFIX):]))
+            importtime_log = child.stderr
+        if not results:
+            continue
+
+        best = min(results, key=lambda result: result["import_s"] + result["boot_s"])
+        print(f"{entry} ({', '.join(features)})")
+        print(f"   import device_core {best['import_s'] * 1000:7.1f} ms")
+        print(f"   boot to listening  {best['boot_s'] * 1000:7.1f} ms")
+        print(f"   heavy modules      {', '.join(best['loaded']) or '-'}")
+        if best["camera_import_s"] is not None:
+            print(f"   deferred camera    {best['camera_import_s'] * 1000:7.1f} ms (OpenCV, on first pouch check)")
+        print("   top-level imports (last run, -X importtime):")
+        for seconds, name in top_imports(importtime_log, args.top):
+            print(f"      {seconds * 1000:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Check: does StreamingPlayer get every sample of a streamed reply to the mixer?
+
+pygame's dummy driver (used by bench_device_e2e.py) discards its output, so
+a segment the player loses is invisible there. This runs StreamingPlayer on
+SDL's disk audio driver, which mixes in real time like a sound card but
+writes the mixed samples to a file. A WAV reply with no silent samples is
+streamed in chunks (optionally throttled to --download-kbps), and the
+non-silent samples in the file are counted against the samples sent. Each
+run passes only if all of them came out. Underruns are reported alongside.
+
+Usage:
+    python benchmarks/bench_streaming_player.py [--runs 5] [--seconds 3] [--download-kbps 0]
+"""
+
+import os
+import io
+import sys
+import time
+import wave
+import argparse
+import tempfile
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+SAMPLE_RATE = 22050  # The device's mixer rate, so no resampling changes the count
+CHUNK_BYTES = 4096
+
+
+def reply_wav(seconds):
+    """Mono 16-bit WAV of a 440 Hz tone that never touches zero"""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    pcm = (np.sin(2 * np.pi * 440 * t) * 8000).astype('<i2')
+    pcm[pcm == 0] = 1
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue(), len(pcm)
+
+
+def download(data, kbps):
+    """Response chunks, paced to `kbps` (0 = as fast as possible)"""
+    for start in range(0, len(data), CHUNK_BYTES):
+        chunk = data[start:start + CHUNK_BYTES]
+        if kbps:
+            time.sleep(len(chunk) * 8 / (kbps * 1000))
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming player output check")
+    parser.add_argument('--runs', type=int, default=5, help='Replies to play')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Reply length')
+    parser.add_argument('--download-kbps', type=float, default=0, help='Throttle the download (0 = off)')
+    args = parser.parse_args()
+
+    output = os.path.join(tempfile.mkdtemp(prefix="babu-player-"), "mixer.raw")
+    os.environ["SDL_AUDIODRIVER"] = "disk"
+    os.environ["SDL_DISKAUDIOFILE"] = output
+
+    import pygame
+    from streaming_player import StreamingPlayer
+
+    # Same mixer setup as device_core.AssistiveVoiceDevice
+    pygame.mixer.pre_init(frequency=SAMPLE_RATE, size=-16, channels=1, buffer=512)
+    pygame.mixer.init()
+    data, samples = reply_wav(args.seconds)
+    player = StreamingPlayer()
+
+    print(f"{args.seconds:.1f}s reply ({samples} samples), disk audio driver, "
+          f"download {'unthrottled' if not args.download_kbps else f'{args.download_kbps:.0f} kbps'}")
+    failures = 0
+    for run in range(1, args.runs + 1):
+        offset = os.path.getsize(output)
+        stats = player.play(download(data, args.download_kbps))
+        time.sleep(0.3)  # Let the driver write out its last buffers
+        played = int(np.count_nonzero(np.fromfile(output, dtype='<i2', offset=offset)))
+        ok = played == samples
+        failures += not ok
+        print(f"run {run}: {played:6d}/{samples} samples  underruns {stats['underruns']}  "
+              f"{'pass' if ok else 'FAIL'}")
+
+    pygame.mixer.quit()
+    os.remove(output)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
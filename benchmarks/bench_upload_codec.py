@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes on the wire and end-to-end upload time per codec
+
+Runs a local HTTP server whose receive side is throttled to a given link
+speed and round-trip time, then uploads the same utterance as WAV, FLAC and
+Opus. The server decodes each upload with soundfile, like the backend does,
+so the end-to-end time covers encode + transfer + decode.
+
+Usage:
+    python benchmarks/bench_upload_codec.py [utterance.wav] [--kbps 128] [--rtt-ms 300]
+"""
+
+import io
+import os
+import sys
+import time
+import wave
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from audio_buffers import buffer_size
+from audio_codec import encode_upload
+
+CHUNK_BYTES = 1024
+
+
+def throttled_handler(kbps, rtt_ms):
+    """Request handler that reads the body no faster than `kbps`"""
+    bytes_per_second = kbps * 1000 / 8
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            time.sleep(rtt_ms / 1000)
+            remaining = int(self.headers['Content-Length'])
+            body = bytearray()
+            while remaining:
+                chunk = self.rfile.read(min(CHUNK_BYTES, remaining))
+                body += chunk
+                remaining -= len(chunk)
+                time.sleep(len(chunk) / bytes_per_second)
+
+            # Decode the multipart payload's file part just like the backend
+            boundary = self.headers['Content-Type'].split('boundary=')[1].encode()
+            part = body.split(b'--' + boundary)[1]
+            payload = part.split(b'\r\n\r\n', 1)[1].rsplit(b'\r\n', 1)[0]
+            sf.read(io.BytesIO(payload), dtype='int16')
+
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def load_utterance(path):
+    """Return (frames, rate) from a 16-bit mono WAV, or a synthetic 8 s clip"""
+    if path:
+        with wave.open(path, 'rb') as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                sys.exit("✗ Need a 16-bit mono WAV")
+            return [wf.readframes(wf.getnframes())], wf.getframerate()
+
+    rate = 16000
+    rng = np.random.default_rng(3)
+    t = np.arange(rate * 8) / rate
+    voiced = np.sin(2 * np.pi * 140 * t) + 0.5 * np.sin(2 * np.pi * 280 * t)
+    envelope = np.clip(np.sin(2 * np.pi * 1.5 * t), 0, None) * (t < 5)
+    samples = (voiced * envelope * 6000 + rng.normal(0, 80, len(t))).astype('<i2')
+    return [samples.tobytes()], rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload codec benchmark")
+    parser.add_argument('wav', nargs='?', help='16-bit mono WAV (default: synthetic 8 s clip)')
+    parser.add_argument('--kbps', type=float, default=128.0, help='Link speed in kbit/s (weak Wi-Fi / 3G)')
+    parser.add_argument('--rtt-ms', type=float, default=300.0, help='Round-trip latency')
+    args = parser.parse_args()
+
+    frames, rate = load_utterance(args.wav)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), throttled_handler(args.kbps, args.rtt_ms))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/audio"
+
+    print(f"Link: {args.kbps:.0f} kbit/s, {args.rtt_ms:.0f} ms RTT")
+    print(f"{'codec':6s} {'bytes':>9s} {'encode':>8s} {'upload':>8s} {'total':>8s}")
+
+    session = requests.Session()
+    for codec in ("wav", "flac", "opus"):
+        start = time.perf_counter()
+        buffer, filename, mimetype = encode_upload(frames, 1, 2, rate, codec=codec)
+        encoded = time.perf_counter()
+
+        size = buffer_size(buffer)
+        session.post(url, files={'audio': (filename, buffer, mimetype)}, timeout=600)
+        done = time.perf_counter()
+        buffer.close()
+
+        print(f"{codec:6s} {size:9d} {(encoded - start) * 1000:6.1f}ms "
+              f"{done - encoded:7.2f}s {done - start:7.2f}s")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: capture time saved by VAD endpointing over the fixed 8 s timer
+
+Each WAV in the corpus is treated as one utterance. It is padded with quiet
+background noise up to the maximum recording length (the microphone keeps
+running after the speaker stops) and fed to VoiceActivityEndpointer in
+20 ms chunks, exactly like the device recorder does.
+
+Usage:
+    python benchmarks/bench_vad_endpointing.py path/to/wav_corpus
+    python benchmarks/bench_vad_endpointing.py --synthetic 20
+"""
+
+import os
+import sys
+import glob
+import time
+import wave
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from vad import VoiceActivityEndpointer
+
+MAX_SECONDS = 8.0
+CHUNK_MS = 20
+
+
+def load_wav(path):
+    """Return (int16 mono samples, sample rate) or None if unsupported"""
+    try:
+        with wave.open(path, 'rb') as wf:
+            if wf.getsampwidth() != 2:
+                return None
+            rate = wf.getframerate()
+            channels = wf.getnchannels()
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype='<i2')
+    except (wave.Error, EOFError):
+        return None
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, rate
+
+
+def synthetic_corpus(count, rate=16000, seed=7):
+    """Speech-like bursts (modulated noise) of 0.8-5 s with short pauses"""
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for i in range(count):
+        parts = [rng.normal(0, 60, int(rate * 0.3))]
+        for _ in range(rng.integers(1, 4)):
+            length = int(rate * rng.uniform(0.4, 1.8))
+            envelope = np.abs(np.sin(np.linspace(0, np.pi * rng.integers(2, 8), length)))
+            parts.append(rng.normal(0, 3000, length) * envelope)
+            parts.append(rng.normal(0, 60, int(rate * rng.uniform(0.1, 0.4))))
+        clip = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+        corpus.append((f"synthetic_{i:02d}", clip, rate))
+    return corpus
+
+
+def endpoint(samples, rate, trailing_silence_ms, rng):
+    """Feed one padded utterance to the endpointer; return (seconds, reason)"""
+    max_samples = int(MAX_SECONDS * rate)
+    if len(samples) < max_samples:
+        padding = rng.normal(0, 60, max_samples - len(samples)).astype(np.int16)
+        samples = np.concatenate([samples, padding])
+    samples = samples[:max_samples]
+
+    endpointer = VoiceActivityEndpointer(
+        sample_rate=rate,
+        trailing_silence_ms=trailing_silence_ms,
+        max_duration_ms=int(MAX_SECONDS * 1000)
+    )
+    # The device seeds the floor from the second of audio before the wake word
+    background = rng.normal(0, 60, rate).astype('<i2')
+    endpointer.calibrate(background.tobytes())
+
+    chunk = int(rate * CHUNK_MS / 1000)
+    pcm = samples.astype('<i2').tobytes()
+    for offset in range(0, len(pcm), chunk * 2):
+        if endpointer.process(pcm[offset:offset + chunk * 2]):
+            break
+
+    return endpointer.duration_ms / 1000, endpointer.reason or "max_duration"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD endpointing capture-time benchmark")
+    parser.add_argument('corpus', nargs='?', help='Directory of 16-bit WAV files')
+    parser.add_argument('--synthetic', type=int, default=0, help='Generate N synthetic utterances instead')
+    parser.add_argument('--trailing-silence-ms', type=int, default=1000)
+    args = parser.parse_args()
+
+    corpus = []
+    if args.synthetic:
+        corpus = synthetic_corpus(args.synthetic)
+    elif args.corpus:
+        for path in sorted(glob.glob(os.path.join(args.corpus, '*.wav'))):
+            loaded = load_wav(path)
+            if loaded is None:
+                print(f"⚠️  Skipping unsupported file: {os.path.basename(path)}")
+                continue
+            corpus.append((os.path.basename(path), *loaded))
+    else:
+        parser.error("give a corpus directory or --synthetic N")
+
+    if not corpus:
+        print("✗ No usable WAV files")
+        sys.exit(1)
+
+    rng = np.random.default_rng(0)
+    captured = []
+    cpu_start = time.process_time()
+
+    print(f"{'file':40s} {'speech':>7s} {'capture':>8s} {'saved':>6s}  reason")
+    for name, samples, rate in corpus:
+        seconds, reason = endpoint(samples, rate, args.trailing_silence_ms, rng)
+        captured.append(seconds)
+        print(f"{name[:40]:40s} {len(samples) / rate:6.2f}s {seconds:7.2f}s "
+              f"{MAX_SECONDS - seconds:5.2f}s  {reason}")
+
+    cpu = time.process_time() - cpu_start
+    audio_seconds = sum(captured)
+    average = sum(captured) / len(captured)
+
+    print()
+    print(f"Utterances:               {len(captured)}")
+    print(f"Fixed timer capture:      {MAX_SECONDS:.2f} s")
+    print(f"Average VAD capture:      {average:.2f} s")
+    print(f"Average time saved:       {MAX_SECONDS - average:.2f} s per interaction")
+    print(f"Endpointer CPU cost:      {cpu / audio_seconds * 1000:.2f} ms per second of audio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CPU cost of wake word listening, always-on vs. energy-gated
+
+Builds a synthetic stretch of microphone audio: background noise with a
+few spoken sentences (which should reach the engine but not fire it) and
+wake word tones (which must fire it). The audio is run offline through the
+same loop the device uses, once feeding every frame to the engine and once
+through the low-power EnergyGate, and the benchmark reports CPU seconds per
+hour of audio, the share of frames the engine saw, and how many of the wake
+words were detected.
+
+The engine is fake_device.FakePorcupine, whose per-frame FFT stands in for
+Porcupine's cost. Real Porcupine costs more per frame, so the saving on a
+device is at least the pass ratio shown here.
+
+Usage:
+    python benchmarks/bench_wake_gate.py [--minutes 10] [--wakes 6] [--noise 80]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import fake_device
+from pcm_frames import PCMFrameConverter
+from wake_gate import EnergyGate
+
+SAMPLE_RATE = fake_device.SAMPLE_RATE
+FRAME_LENGTH = fake_device.PORCUPINE_FRAME_LENGTH
+BLOCK_FRAMES = 4  # AssistiveVoiceDevice.GATE_BLOCK_FRAMES
+
+
+def build_audio(minutes, wakes, noise, seed=3):
+    """Noise with sentences and wake tones spread through it; returns (pcm, wake end offsets)"""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    audio = rng.normal(0, noise, total)
+
+    sentence = fake_device.synth_question().astype(np.float64)
+    tone = fake_device.wake_tone().astype(np.float64)
+    events = wakes * 2  # One sentence of chatter per wake word
+    wake_ends = []
+    for index in range(events):
+        start = int((index + 0.5) * total / events)
+        clip = tone if index % 2 else sentence
+        audio[start:start + len(clip)] += clip
+        if index % 2:
+            wake_ends.append((start + len(clip)) * 2)
+
+    pcm = np.clip(audio, -32768, 32767).astype('<i2').tobytes()
+    usable = len(pcm) - len(pcm) % (FRAME_LENGTH * 2 * BLOCK_FRAMES)
+    return pcm[:usable], wake_ends
+
+
+def listen(pcm, gated):
+    """Run the device's wake word loop over the audio; returns (cpu s, frames to engine, detections)"""
+    porcupine = fake_device.FakePorcupine()
+    frames = PCMFrameConverter(FRAME_LENGTH)
+    gate = EnergyGate(FRAME_LENGTH, sample_rate=SAMPLE_RATE) if gated else None
+    block = FRAME_LENGTH * 2 * (BLOCK_FRAMES if gated else 1)
+
+    processed = 0
+    detections = []
+    started = time.thread_time()
+    for offset in range(0, len(pcm), block):
+        data = pcm[offset:offset + block]
+        position = offset + len(data)
+        candidates = gate.process(data, position) if gate else [(position, data)]
+        for frame_position, frame in candidates:
+            processed += 1
+            if porcupine.process(frames.convert(frame)) >= 0:
+                detections.append(frame_position)
+    return time.thread_time() - started, processed, detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wake word listening CPU benchmark")
+    parser.add_argument('--minutes', type=float, default=10, help='Minutes of audio to listen to')
+    parser.add_argument('--wakes', type=int, default=6, help='Wake words in the audio')
+    parser.add_argument('--noise', type=float, default=80, help='Background noise std dev (int16 units)')
+    args = parser.parse_args()
+
+    pcm, wake_ends = build_audio(args.minutes, args.wakes, args.noise)
+    audio_hours = len(pcm) / 2 / SAMPLE_RATE / 3600
+    total_frames = len(pcm) // (FRAME_LENGTH * 2)
+    print(f"{args.minutes:.0f} min of audio, noise σ={args.noise:.0f}, {args.wakes} wake words")
+
+    baseline = None
+    for name, gated in (("always-on", False), ("energy-gated", True)):
+        cpu, processed, detections = listen(pcm, gated)
+        per_hour = cpu / audio_hours
+        baseline = baseline or per_hour
+        # A detection counts if it lands within a few frames of the tone's end
+        hits = sum(any(abs(at - end) <= FRAME_LENGTH * 4 for at in detections) for end in wake_ends)
+        print(f"{name:13} {per_hour:7.1f} CPU s per audio hour ({per_hour / baseline:4.0%})  "
+              f"{processed / total_frames:6.1%} of frames to engine  "
+              f"{hits}/{len(wake_ends)} wake words, {len(detections) - hits} false")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Synthetic pouch camera frames for benchmarking the color classifiers
+
+pouch_frame() draws a 640×480 BGR scene: a wooden table with a shadow
+gradient and sensor noise, and (optionally) a rotated pouch of the given
+color with a printed white label. Lighting can be dimmed, and clutter adds
+small colored objects that must not be mistaken for the pouch.
+FakeVideoCapture serves a frame with V4L2-like buffering delays.
+"""
+
+import time
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+WIDTH, HEIGHT = 640, 480
+
+POUCH_BGR = {
+    'red': (45, 40, 190),
+    'green': (60, 165, 55),
+    'blue': (185, 95, 30),
+    'yellow': (40, 205, 225),
+    'white': (235, 235, 232),
+}
+TABLE_BGR = (95, 115, 140)
+
+
+def pouch_frame(color, rng, light=1.0, clutter=0, size=None, decoy=None):
+    """One frame showing a `color` pouch (None for an empty table)
+
+    With `decoy`, a smaller pouch of that color lies beside it, in the right
+    half of the frame.
+    """
+    y, x = np.mgrid[0:HEIGHT, 0:WIDTH].astype(np.float32)
+    shade = 0.75 + 0.25 * (x / WIDTH) * (1 - 0.5 * y / HEIGHT)
+    frame = np.empty((HEIGHT, WIDTH, 3), np.float32)
+    frame[:] = TABLE_BGR
+    frame *= shade[..., None]
+
+    for _ in range(clutter):
+        bgr = tuple(int(c) for c in rng.integers(40, 220, 3))
+        center = (int(rng.integers(20, WIDTH - 20)), int(rng.integers(20, HEIGHT - 20)))
+        cv2.circle(frame, center, int(rng.integers(6, 22)), bgr, -1)
+
+    if color and decoy:
+        side = size or int(rng.integers(130, 160))
+        _draw_pouch(frame, color, rng, side, (side, WIDTH // 2 - side // 2))
+        _draw_pouch(frame, decoy, rng, int(side * 0.8), (WIDTH // 2 + side // 2, WIDTH - side))
+    elif color:
+        side = size or int(rng.integers(150, 230))
+        _draw_pouch(frame, color, rng, side, (side, WIDTH - side))
+
+    frame *= light
+    frame += rng.normal(0, 6, frame.shape)
+    frame = cv2.GaussianBlur(frame, (3, 3), 0)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def _draw_pouch(frame, color, rng, side, x_range):
+    """A rotated pouch with a printed white label, centred within x_range"""
+    center = (float(rng.integers(*x_range)), float(rng.integers(side // 2 + 40, HEIGHT - side // 2 - 40)))
+    box = cv2.boxPoints((center, (side * rng.uniform(0.85, 1.15), side), float(rng.uniform(-25, 25))))
+    cv2.fillPoly(frame, [box.astype(np.int32)], POUCH_BGR[color])
+    label = cv2.boxPoints((center, (side * 0.5, side * 0.2), 0.0))
+    cv2.fillPoly(frame, [label.astype(np.int32)], (245, 245, 245))
+
+
+def frame_set(count, seed=11):
+    """(expected color or None, frame, condition) cases across colors and conditions"""
+    rng = np.random.default_rng(seed)
+    colors = list(POUCH_BGR)
+    cases = []
+    for index in range(count):
+        condition = ("normal", "dim", "clutter", "empty")[index % 4]
+        color = None if condition == "empty" else colors[index // 4 % len(colors)]
+        light = 0.45 if condition == "dim" else 1.0
+        clutter = 12 if condition == "clutter" else 0
+        cases.append((color, pouch_frame(color, rng, light=light, clutter=clutter), condition))
+    return cases
+
+
+class FakeVideoCapture:
+    """cv2.VideoCapture stand-in with V4L2-style buffer queueing
+
+    The sensor produces a frame every 1/fps seconds. The driver keeps the
+    oldest `buffers` frames nobody has dequeued and drops later ones, and
+    read() returns the oldest queued frame, blocking for the next one when
+    the queue is empty. After a pause, a read therefore returns a frame
+    captured just after the previous read. Each frame carries its capture
+    time (see capture_time()). `frame` is an image, or a function of the
+    seconds since opening that returns the scene at that moment.
+    """
+
+    def __init__(self, frame, fps=15, buffers=4):
+        self.scene = frame if callable(frame) else (lambda seconds: frame)
+        self.interval = 1.0 / fps
+        self.buffers = buffers
+        self.started = time.monotonic()
+        self.next_index = 0  # Next sensor frame that could be queued
+        self.queue = deque()
+        self.lock = threading.Lock()
+        self.opened = True
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_BUFFERSIZE:
+            self.buffers = max(1, int(value))
+        return True
+
+    def grab(self):
+        if not self.opened:
+            return False
+        with self.lock:
+            self._fill(time.monotonic())
+            if not self.queue:
+                captured_at = self.started + self.next_index * self.interval
+                time.sleep(max(0.0, captured_at - time.monotonic()))
+                self._fill(time.monotonic())
+            self.grabbed = self.queue.popleft()
+        return True
+
+    def retrieve(self):
+        frame = self.scene(self.grabbed - self.started).copy()
+        frame.reshape(-1)[:8] = np.frombuffer(np.float64(self.grabbed).tobytes(), np.uint8)
+        return True, frame
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def release(self):
+        self.opened = False
+
+    def _fill(self, now):
+        while self.started + self.next_index * self.interval <= now:
+            if len(self.queue) < self.buffers:
+                self.queue.append(self.started + self.next_index * self.interval)
+            self.next_index += 1
+
+
+def capture_time(frame):
+    """time.monotonic() at which a FakeVideoCapture frame was captured"""
+    return float(np.frombuffer(frame.reshape(-1)[:8].tobytes(), np.float64)[0])
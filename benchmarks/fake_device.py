@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Hardware fakes for running AssistiveVoiceDevice headless
+
+install_fakes() registers stand-in `pyaudio` and `pvporcupine` modules, so
+it must run before the device's conversation feature starts. The fake
+microphone plays background noise in real time. Once the device has been
+listening for a moment (see prompt_while_listening), the scripted user says
+the wake word followed by a question. A 1 kHz tone burst stands in for the
+wake word, and the fake Porcupine fires when the tone ends. The question
+and the background are synthesized by default; load_wav()/load_wavs() read
+recordings to use instead. StubBackend answers /audio and /audio/stream
+like backend/app.py and serves the reply audio.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import wave
+import types
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+NOISE_LEVEL = 80  # Background noise standard deviation (int16 units)
+WAKE_TONE_HZ = 1000
+WAKE_TONE_SECONDS = 0.6
+PORCUPINE_FRAME_LENGTH = 512
+
+
+def synth_question(seconds=2.5, rate=SAMPLE_RATE, seed=0):
+    """Voiced, syllable-shaped int16 audio that the endpointer treats as speech"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    pitch = 140 + 20 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voiced = np.sin(phase) + 0.5 * np.sin(2 * phase) + 0.25 * np.sin(3 * phase)
+    syllables = 0.35 + 0.65 * np.clip(np.sin(2 * np.pi * 3.0 * t), 0, None)
+    samples = voiced * syllables * 6000 + rng.normal(0, NOISE_LEVEL, len(t))
+    return samples.astype(np.int16)
+
+
+def load_wav(path, rate=SAMPLE_RATE):
+    """16-bit WAV file as int16 mono at `rate` (channels averaged, linear resampling)"""
+    with wave.open(path, 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        channels, source_rate = wf.getnchannels(), wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype='<i2').astype(np.float32)
+    samples = samples.reshape(-1, channels).mean(axis=1)
+    if source_rate != rate and len(samples):
+        positions = np.arange(int(len(samples) * rate / source_rate)) * source_rate / rate
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+def load_wavs(path, rate=SAMPLE_RATE):
+    """One WAV file, or every .wav in a corpus directory (sorted by name)"""
+    if not os.path.isdir(path):
+        return [load_wav(path, rate)]
+    names = sorted(name for name in os.listdir(path) if name.lower().endswith('.wav'))
+    if not names:
+        raise ValueError(f"{path}: no .wav files")
+    return [load_wav(os.path.join(path, name), rate) for name in names]
+
+
+def wake_tone(rate=SAMPLE_RATE):
+    """Stand-in for the spoken wake word"""
+    t = np.arange(int(rate * WAKE_TONE_SECONDS)) / rate
+    return (np.sin(2 * np.pi * WAKE_TONE_HZ * t) * 8000).astype(np.int16)
+
+
+def tone_wav(path, freq, seconds, rate=22050, volume=0.3):
+    """Write a short sine cue (used for start/waiting/ending/error sounds)"""
+    t = np.arange(int(rate * seconds)) / rate
+    fade = np.minimum(1.0, np.minimum(t, seconds - t) * 50)
+    samples = (np.sin(2 * np.pi * freq * t) * fade * volume * 32767).astype('<i2')
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+
+
+def reply_wav(seconds=3.0, rate=24000):
+    """TTS-sized reply: 16-bit mono WAV bytes at the backend's output rate"""
+    samples = synth_question(seconds, rate=rate, seed=1)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+class ScriptedMicrophone:
+    """Real-time int16 mono source: background noise plus queued utterances
+
+    `question` is one int16 recording or a list of them, asked in turn.
+    Without `background` the room is Gaussian noise and an utterance replaces
+    it; with a `background` recording (looped), utterances are mixed over it.
+    """
+
+    def __init__(self, question, rate=SAMPLE_RATE, background=None):
+        self.rate = rate
+        self.questions = question if isinstance(question, list) else [question]
+        self.background = background if background is not None and len(background) else None
+        self.background_at = 0
+        self.pending = deque()
+        self.lock = threading.Lock()
+        self.rng = np.random.default_rng(7)
+        self.utterances = 0
+        self.break_next_stream = False
+
+    def break_stream(self):
+        """Make the open stream stop delivering audio, like a wedged ALSA device"""
+        self.break_next_stream = True
+
+    def say_wake_word_and_question(self):
+        with self.lock:
+            self.pending.append(wake_tone(self.rate))
+            self.pending.append(self.rng.normal(0, NOISE_LEVEL, int(self.rate * 0.15)).astype(np.int16))
+            self.pending.append(self.questions[self.utterances % len(self.questions)])
+            self.utterances += 1
+
+    def read(self, num_samples):
+        if self.background is None:
+            out = self.rng.normal(0, NOISE_LEVEL, num_samples).astype(np.int16)
+        else:
+            indices = (self.background_at + np.arange(num_samples)) % len(self.background)
+            self.background_at = (self.background_at + num_samples) % len(self.background)
+            out = self.background[indices]
+        filled = 0
+        with self.lock:
+            while self.pending and filled < num_samples:
+                head = self.pending[0]
+                take = min(len(head), num_samples - filled)
+                if self.background is None:
+                    out[filled:filled + take] = head[:take]
+                else:
+                    mixed = out[filled:filled + take].astype(np.int32) + head[:take]
+                    out[filled:filled + take] = np.clip(mixed, -32768, 32767)
+                filled += take
+                if take == len(head):
+                    self.pending.popleft()
+                else:
+                    self.pending[0] = head[take:]
+        return out
+
+
+class FakeStream:
+    """PyAudio callback stream driven by a ScriptedMicrophone at real-time pace"""
+
+    def __init__(self, mic, frames_per_buffer, stream_callback):
+        self.mic = mic
+        self.frames_per_buffer = frames_per_buffer
+        self.callback = stream_callback
+        self.running = threading.Event()
+        self.thread = None
+
+    def start_stream(self):
+        self.running.set()
+        self.thread = threading.Thread(target=self._pump, daemon=True)
+        self.thread.start()
+
+    def _pump(self):
+        import pyaudio
+
+        period = self.frames_per_buffer / self.mic.rate
+        next_time = time.monotonic()
+        dead = False
+        while self.running.is_set():
+            if self.mic.break_next_stream:
+                self.mic.break_next_stream = False
+                dead = True  # Until the stream is closed and a new one opened
+            # A pump running a whole buffer late stands in for an ALSA overrun
+            late = time.monotonic() - next_time > period
+            if not dead:
+                data = self.mic.read(self.frames_per_buffer).tobytes()
+                self.callback(data, self.frames_per_buffer, {}, pyaudio.paInputOverflow if late else 0)
+            next_time += period
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def is_active(self):
+        return self.running.is_set()
+
+    def stop_stream(self):
+        self.running.clear()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+    def close(self):
+        self.stop_stream()
+
+
+class FakePyAudio:
+    def __init__(self, mic):
+        self.mic = mic
+
+    def open(self, rate=SAMPLE_RATE, frames_per_buffer=512, stream_callback=None, **kwargs):
+        return FakeStream(self.mic, frames_per_buffer, stream_callback)
+
+    def get_sample_size(self, format):
+        return 2
+
+    def terminate(self):
+        pass
+
+
+class FakePorcupine:
+    """Fires when a wake tone ends
+
+    The FFT per frame stands in for the real engine's per-frame cost.
+    """
+
+    def __init__(self):
+        self.frame_length = PORCUPINE_FRAME_LENGTH
+        self.sample_rate = SAMPLE_RATE
+        self.tone_bin = round(WAKE_TONE_HZ * self.frame_length / SAMPLE_RATE)
+        self.tone_frames = 0
+
+    def process(self, pcm):
+        spectrum = np.abs(np.fft.rfft(np.frombuffer(pcm, dtype=np.int16).astype(np.float32)))
+        power = spectrum * spectrum
+        is_tone = power[self.tone_bin] > 0.5 * power.sum()
+
+        if is_tone:
+            self.tone_frames += 1
+            return -1
+        if self.tone_frames >= 8:
+            self.tone_frames = 0
+            return 0
+        self.tone_frames = 0
+        return -1
+
+    def delete(self):
+        pass
+
+
+def install_fakes(mic):
+    """Register fake pyaudio/pvporcupine modules; call before creating the device"""
+    pyaudio = types.ModuleType("pyaudio")
+    pyaudio.paInt16 = 8
+    pyaudio.paContinue = 0
+    pyaudio.paInputUnderflow = 1
+    pyaudio.paInputOverflow = 2
+    pyaudio.PyAudio = lambda: FakePyAudio(mic)
+
+    pvporcupine = types.ModuleType("pvporcupine")
+    pvporcupine.create = lambda access_key=None, keyword_paths=None, **kwargs: FakePorcupine()
+
+    sys.modules["pyaudio"] = pyaudio
+    sys.modules["pvporcupine"] = pvporcupine
+
+
+def prompt_while_listening(device, mic, idle_seconds=1.0):
+    """Have the scripted user speak after each `idle_seconds` of wake word listening
+
+    Timed by the wall clock rather than by engine calls, since in low-power
+    mode the engine never sees the quiet frames.
+    """
+    detect_wake_word = device.detect_wake_word
+
+    def detect_after_idle():
+        timer = threading.Timer(idle_seconds, mic.say_wake_word_and_question)
+        timer.daemon = True
+        timer.start()
+        try:
+            return detect_wake_word()
+        finally:
+            timer.cancel()
+
+    device.detect_wake_word = detect_after_idle
+
+
+def read_chunked(rfile):
+    """Body of a request sent with Transfer-Encoding: chunked"""
+    body = bytearray()
+    while True:
+        size = int(rfile.readline().split(b';')[0].strip(), 16)
+        if size == 0:
+            rfile.readline()  # Blank line after the last chunk
+            return bytes(body)
+        body += rfile.read(size)
+        rfile.readline()
+
+
+class StubBackend:
+    """Local stand-in for backend/app.py with a configurable processing delay"""
+
+    def __init__(self, reply, reply_name="reply.wav", processing_ms=1200, download_kbps=None):
+        self.reply = reply
+        self.reply_name = reply_name
+        self.processing_s = processing_ms / 1000
+        self.download_kbps = download_kbps
+        self.requests = 0
+        self.server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path == "/":
+                    self._send(b'{"message": "stub backend"}', "application/json")
+                elif self.path == f"/api/play_audio/{backend.reply_name}":
+                    self._send(backend.reply, "audio/wav", throttle=True)
+                else:
+                    self._send(b'{"error": "not found"}', "application/json", status=404)
+
+            def do_POST(self):
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    read_chunked(self.rfile)
+                else:
+                    self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+                if self.path not in ("/audio", "/audio/stream"):
+                    self._send(b'{"error": "not found"}', "application/json", status=404)
+                    return
+
+                backend.requests += 1
+                time.sleep(backend.processing_s)  # ASR + LLM + TTS
+                host = self.headers.get("Host")
+                reply = {
+                    "transcription": "stub question",
+                    "response": "stub answer",
+                    "full_play_url": f"http://{host}/api/play_audio/{backend.reply_name}",
+                }
+                self._send(json.dumps(reply).encode(), "application/json")
+
+            def _send(self, body, content_type, status=200, throttle=False):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not (throttle and backend.download_kbps):
+                    self.wfile.write(body)
+                    return
+                bytes_per_second = backend.download_kbps * 1000 / 8
+                for offset in range(0, len(body), 4096):
+                    piece = body[offset:offset + 4096]
+                    self.wfile.write(piece)
+                    time.sleep(len(piece) / bytes_per_second)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
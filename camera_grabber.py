@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Background camera reader that always holds the newest frame
+"""
+
+import time
+import threading
+
+
+class FrameGrabber:
+    """Drains a cv2.VideoCapture on its own thread into a one-frame slot
+
+    V4L2 queues several frames, so an on-demand read() can return one that
+    is a second old, and it blocks until the driver hands one over. Here a
+    thread reads continuously and keeps only the newest frame, so latest()
+    returns a fresh frame at once. While paused the thread stops reading;
+    on resume it first drains what the driver queued in the meantime.
+    """
+
+    def __init__(self, cap, fps=15):
+        self.cap = cap
+        self.frame_interval = 1.0 / fps
+        self.frame = None
+        self.frame_time = 0.0  # time.monotonic() when the frame arrived
+        self.sequence = 0  # Frames published so far
+        self.read_failures = 0
+        self.condition = threading.Condition()
+        self.running = threading.Event()  # Clear while paused
+        self.stopped = False
+        self.thread = None
+
+    def start(self):
+        """Start (or resume) grabbing"""
+        if not self.thread:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        self.running.set()
+
+    def pause(self):
+        """Stop reading the camera until the next start()"""
+        self.running.clear()
+
+    resume = start
+
+    def stop(self):
+        """End the thread; the capture can be released afterwards"""
+        self.stopped = True
+        self.running.set()
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+
+    def latest(self, max_age=0.5, timeout=1.0, after=0):
+        """Newest frame, waiting up to `timeout` if it is older than `max_age` seconds
+
+        With `after`, only a frame published after that sequence number is
+        returned, so a caller never gets the same frame twice.
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while (self.frame is None or time.monotonic() - self.frame_time > max_age
+                   or self.sequence <= after):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.stopped:
+                    return None
+                self.condition.wait(remaining)
+            return self.frame
+
+    def _run(self):
+        while True:
+            self.running.wait()
+            if self.stopped:
+                return
+            self._drain()
+            while self.running.is_set() and not self.stopped:
+                ret, frame = self.cap.read()
+                if not ret:
+                    self.read_failures += 1
+                    time.sleep(self.frame_interval)
+                    continue
+                with self.condition:
+                    self.frame = frame
+                    self.frame_time = time.monotonic()
+                    self.sequence += 1
+                    self.condition.notify_all()
+
+    def _drain(self, max_frames=5):
+        """Discard frames the driver queued while nothing was reading"""
+        for _ in range(max_frames):
+            started = time.monotonic()
+            if not self.cap.grab():
+                return
+            if time.monotonic() - started > self.frame_interval / 2:
+                return  # Had to wait for the sensor: the queue is empty
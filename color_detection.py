@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Color Detection using Gemini API for medication pouches
+Color Detection for medication pouches: local OpenCV classifier, Gemini API as fallback
 """
 
 import cv2
@@ -10,13 +10,56 @@ import requests
 import json
 import os
 from typing import Optional
-from io import BytesIO
-from PIL import Image
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from camera_grabber import FrameGrabber
+from pouch_classifier import PouchClassifier, POUCH_LOCAL_CONFIDENCE
+
+# Pouch validation burst: a frame every BURST_INTERVAL_S until a majority of
+# the last BURST_FRAMES agree, for at most BURST_MAX_WAIT_S
+BURST_FRAMES = 5
+BURST_INTERVAL_S = 0.25
+BURST_MAX_WAIT_S = 6.0
+BURST_WORKERS = 3  # Concurrent Gemini calls for frames the local classifier is unsure of
+
+# Gemini images: the pouch region (or the whole frame), no larger than needed to name a color
+GEMINI_IMAGE_MAX_SIDE = 192
+GEMINI_JPEG_QUALITY = 80
+GEMINI_ROI_MARGIN = 0.25  # Context kept around the candidate regions, as a share of their size
+GEMINI_BATCH = 3  # Unsure burst frames sent in one generateContent request
+
+
+def encode_pouch_image(frame, roi=None, max_side=GEMINI_IMAGE_MAX_SIDE, quality=GEMINI_JPEG_QUALITY):
+    """JPEG bytes of the frame, cropped to roi (x, y, w, h) and shrunk to max_side"""
+    if roi:
+        x, y, w, h = roi
+        frame = frame[y:y + h, x:x + w]
+    
+    height, width = frame.shape[:2]
+    scale = max_side / max(height, width)
+    if scale < 1:
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    
+    # OpenCV encodes BGR directly: no RGB copy, no PIL image
+    ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return jpeg.tobytes() if ok else None
+
+
+def gemini_color_payload(images, prompt):
+    """generateContent body with the prompt followed by each JPEG"""
+    parts = [{"text": prompt}]
+    for jpeg in images:
+        parts.append({"inline_data": {"mime_type": "image/jpeg",
+                                      "data": base64.b64encode(jpeg).decode('ascii')}})
+    return {"contents": [{"parts": parts}]}
+
 
 class ColorDetector:
     def __init__(self, camera_index=0):
         self.camera_index = camera_index
         self.cap = None
+        self.grabber = None  # Keeps the newest frame while the camera is in use
         self.gemini_api_key = self._load_api_key()
         
         if self.gemini_api_key:
@@ -25,6 +68,10 @@ class ColorDetector:
             self.gemini_url = None
         
         self.color_names = {"red", "green", "blue", "yellow", "white", "black"}
+        self.classifier = PouchClassifier()
+        self.local_answers = 0  # Detections the local classifier settled
+        self.gemini_calls = 0
+        self.last_burst = None  # Votes and timing of the last validation
         self._setup_camera()
     
     def _load_api_key(self):
@@ -52,75 +99,137 @@ class ColorDetector:
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
             self.cap.set(cv2.CAP_PROP_FPS, 15)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Fewer stale frames queued in V4L2
             
-            # Warm up camera
-            for _ in range(3):
-                ret, frame = self.cap.read()
-                if ret:
-                    break
-                time.sleep(0.1)
+            self.grabber = FrameGrabber(self.cap, fps=15)
+            self.grabber.start()
+            if self.grabber.latest(timeout=2.0) is None:
+                print("⚠️  Camera opened but no frame yet")
             
             print("✓ Camera ready")
             
             if self.gemini_api_key:
                 print("✓ Gemini API ready")
             else:
-                print("⚠️  Gemini API key missing")
+                print("⚠️  Gemini API key missing (local classifier only)")
             
         except Exception as e:
             print(f"✗ Camera setup failed: {e}")
             self.cap = None
     
-    def _capture_image_base64(self):
-        """Capture and encode image"""
-        if not self.cap:
+    def _read_frame(self, after=0):
+        """Newest BGR frame from the grabber, if published after sequence number `after`"""
+        if not self.grabber:
             return None
         
-        ret, frame = self.cap.read()
-        if not ret:
-            return None
+        self.grabber.resume()
+        return self.grabber.latest(after=after)
+    
+    def pause(self):
+        """Stop reading the camera between medication checks"""
+        if self.grabber:
+            self.grabber.pause()
+    
+    def resume(self):
+        """Start reading again so a fresh frame is ready"""
+        if self.grabber:
+            self.grabber.resume()
+    
+    def _pouch_roi(self, shape):
+        """Box around the local classifier's candidate regions in the last frame, or None
         
-        # Convert to RGB and encode
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(frame_rgb)
+        The regions of every color are covered, with a margin, so an unsure
+        pick between two candidates still shows Gemini both.
+        """
+        boxes = [region['bbox'] for region in self.classifier.last_regions.values()]
+        if not boxes:
+            return None
         
-        buffer = BytesIO()
-        pil_image.save(buffer, format='JPEG', quality=85)
-        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+        left = min(x for x, _, _, _ in boxes)
+        top = min(y for _, y, _, _ in boxes)
+        right = max(x + w for x, _, w, _ in boxes)
+        bottom = max(y + h for _, y, _, h in boxes)
+        margin_x = int((right - left) * GEMINI_ROI_MARGIN)
+        margin_y = int((bottom - top) * GEMINI_ROI_MARGIN)
+        left, top = max(0, left - margin_x), max(0, top - margin_y)
+        right, bottom = min(shape[1], right + margin_x), min(shape[0], bottom + margin_y)
+        return left, top, right - left, bottom - top
     
     def detect_color(self):
-        """Detect dominant color using Gemini API"""
-        if not self.cap or not self.gemini_api_key:
-            print("✗ Camera or API not available")
+        """Detect pouch color locally, asking Gemini only when the local result is unsure"""
+        if not self.cap:
+            print("✗ Camera not available")
             return None
         
         print("📷 Detecting color...")
         
-        image_base64 = self._capture_image_base64()
-        if not image_base64:
+        frame = self._read_frame()
+        if frame is None:
             return None
         
-        prompt = """Identify the most dominant color in this image. 
+        vote = self._classify_frame(frame)
+        if vote["color"]:
+            print(f"✓ Detected: {vote['color']} ({vote['source']}, {vote['latency_s'] * 1000:.0f} ms)")
+        return vote["color"]
+    
+    def _classify_frame(self, frame, ask_gemini=True):
+        """Local classification, with Gemini for unsure frames
+        
+        Returns a vote: color (or None), confidence (None from Gemini),
+        source ("local", "gemini" or "unsure") and latency_s.
+        """
+        started = time.monotonic()
+        color, confidence = self.classifier.classify(frame)
+        if color and confidence >= POUCH_LOCAL_CONFIDENCE:
+            self.local_answers += 1
+            return self._vote(color, confidence, "local", started)
+        
+        print(f"   Local classifier unsure ({color or 'none'}, confidence {confidence:.2f})")
+        roi = self._pouch_roi(frame.shape)
+        if ask_gemini and self.gemini_api_key:
+            return self._gemini_votes([(frame, roi)], started)[0]
+        vote = self._vote(None, confidence, "unsure", started)
+        vote["roi"] = roi
+        return vote
+    
+    def _gemini_votes(self, images, started=None):
+        """Votes from one Gemini request for (frame, roi) pairs"""
+        started = started or time.monotonic()
+        return [self._vote(color, None, "gemini", started) for color in self._detect_colors_gemini(images)]
+    
+    @staticmethod
+    def _vote(color, confidence, source, started):
+        return {"color": color, "confidence": confidence, "source": source,
+                "latency_s": time.monotonic() - started}
+    
+    def _detect_colors_gemini(self, images):
+        """Dominant color of each (frame, roi) pair from a single Gemini request"""
+        jpegs = [encode_pouch_image(frame, roi) for frame, roi in images]
+        if not all(jpegs):
+            print("✗ Image encoding failed")
+            return [None] * len(images)
+        self.gemini_calls += 1
         
+        if len(jpegs) == 1:
+            prompt = """Identify the color of the medication pouch or container in this image.
+
 Respond with ONLY ONE word in lowercase:
 red, green, blue, yellow, white, black, or none
 
-Focus on medication pouches or containers if visible."""
+Answer none if no pouch or container is visible (only a table, wall or floor)."""
+        else:
+            prompt = f"""Identify the color of the medication pouch or container in each of these {len(jpegs)} images.
+
+Respond with ONLY {len(jpegs)} lowercase words, one per image in order, separated by commas.
+Each word is one of: red, green, blue, yellow, white, black, or none
 
-        payload = {
-            "contents": [{
-                "parts": [
-                    {"text": prompt},
-                    {"inline_data": {"mime_type": "image/jpeg", "data": image_base64}}
-                ]
-            }]
-        }
+Answer none for an image with no pouch or container visible (only a table, wall or floor)."""
         
         try:
             response = requests.post(
                 self.gemini_url,
                 headers={'Content-Type': 'application/json'},
-                json=payload,
+                json=gemini_color_payload(jpegs, prompt),
                 timeout=10
             )
             
@@ -128,65 +237,156 @@ Focus on medication pouches or containers if visible."""
                 result = response.json()
                 try:
                     text = result['candidates'][0]['content']['parts'][0]['text'].strip().lower()
-                    if text in self.color_names:
-                        print(f"✓ Detected: {text}")
-                        return text
-                    elif text == "none":
-                        print("✗ No clear color")
-                        return None
-                    else:
-                        print(f"⚠️  Unexpected response: {text}")
-                        return None
                 except (KeyError, IndexError):
                     print("✗ Invalid response format")
-                    return None
+                    return [None] * len(images)
+                
+                words = [word.strip(" .") for word in text.replace("\n", ",").split(",") if word.strip(" .")]
+                if len(words) != len(images):
+                    print(f"⚠️  Unexpected response: {text}")
+                    return [None] * len(images)
+                
+                colors = []
+                for word in words:
+                    if word in self.color_names:
+                        print(f"✓ Detected: {word}")
+                        colors.append(word)
+                    elif word == "none":
+                        print("✗ No clear color")
+                        colors.append(None)
+                    else:
+                        print(f"⚠️  Unexpected response: {word}")
+                        colors.append(None)
+                return colors
             else:
                 print(f"✗ API error: {response.status_code}")
-                return None
+                return [None] * len(images)
                 
         except Exception as e:
             print(f"✗ Detection error: {e}")
-            return None
+            return [None] * len(images)
     
-    def validate_pouch_color(self, expected_color: str) -> bool:
-        """Validate medication pouch color"""
-        print(f"🔍 Expecting {expected_color} pouch")
+    def validate_pouch_color(self, expected_color: str, frames=BURST_FRAMES, interval=BURST_INTERVAL_S,
+                             max_wait=BURST_MAX_WAIT_S, cancel_event=None) -> bool:
+        """Validate medication pouch color from a burst of frames
         
-        time.sleep(2)  # Give user time to position pouch
+        A frame is taken every `interval` seconds and classified locally at
+        once; frames the local classifier is unsure of go to Gemini on
+        worker threads while the burst carries on, cropped to the candidate
+        regions or, with none, as the whole frame (Gemini answers "none" for
+        an empty table or wall, which votes for no color). While a call is
+        in flight, further unsure frames queue up and are sent together,
+        GEMINI_BATCH to a request (the oldest are dropped when no worker is
+        free). The burst ends as soon as a majority of the last `frames`
+        votes agree on a color, or after `max_wait` seconds, which is also
+        the user's time to bring the pouch into view.
+        """
+        print(f"🔍 Expecting {expected_color} pouch")
+        if not self.grabber:
+            print("✗ Camera not available")
+            return False
         
-        # Try 3 times for better accuracy
-        votes = {}
-        for i in range(3):
-            print(f"   Attempt {i+1}/3")
-            color = self.detect_color()
-            if color:
-                votes[color] = votes.get(color, 0) + 1
-            time.sleep(1)
+        started = time.monotonic()
+        deadline = started + max_wait
+        next_capture = started
+        votes = {}  # Frame number -> vote
+        pending = {}  # Gemini future -> [(frame number, capture time)] of its batch
+        unsure = []  # (frame number, capture time, frame, roi) waiting for a Gemini call
+        captures = 0
+        seen = 0  # Grabber sequence number of the last frame classified
+        detected, agreeing = None, 0
         
-        if not votes:
-            print("❌ No color detected")
-            return False
+        def count(number, vote, captured):
+            vote["latency_s"] = time.monotonic() - captured  # Capture to answer
+            votes[number] = vote
+            confidence = f"{vote['confidence']:.2f}" if vote["confidence"] is not None else "-"
+            print(f"   Vote {number}: {vote['color'] or 'none'} ({vote['source']}, "
+                  f"confidence {confidence}, {vote['latency_s'] * 1000:.0f} ms)")
+            return self._majority(votes, frames)
         
-        detected = max(votes, key=votes.get)
-        confidence = votes[detected] / 3 * 100
+        pool = ThreadPoolExecutor(max_workers=BURST_WORKERS)
+        try:
+            while detected is None and not (cancel_event and cancel_event.is_set()):
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                
+                if next_capture <= now:
+                    # After a slow read, skip the missed slots rather than catch up
+                    next_capture = max(next_capture + interval, now + interval)
+                    frame = self._read_frame(after=seen)
+                    if frame is None:
+                        continue
+                    seen = self.grabber.sequence  # No frame votes twice
+                    captured = time.monotonic()
+                    captures += 1
+                    vote = self._classify_frame(frame, ask_gemini=False)
+                    if vote["source"] != "unsure":
+                        detected, agreeing = count(captures, vote, captured)
+                    elif self.gemini_api_key:
+                        unsure = (unsure + [(captures, captured, frame, vote["roi"])])[-GEMINI_BATCH:]
+                    
+                    # Send at once when Gemini is idle, otherwise wait for a full batch
+                    if unsure and len(pending) < BURST_WORKERS and (not pending or len(unsure) >= GEMINI_BATCH):
+                        batch, unsure = unsure, []
+                        images = [(frame, roi) for _, _, frame, roi in batch]
+                        future = pool.submit(self._gemini_votes, images)
+                        pending[future] = [(number, captured) for number, captured, _, _ in batch]
+                    continue
+                
+                timeout = min(next_capture, deadline) - now
+                if not pending:
+                    time.sleep(timeout)
+                    continue
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for (number, captured), vote in zip(pending.pop(future), future.result()):
+                        detected, agreeing = count(number, vote, captured)
+                        if detected:
+                            break
+                    if detected:
+                        break
+        finally:
+            # Late Gemini answers are no longer needed
+            pool.shutdown(wait=False, cancel_futures=True)
         
-        print(f"✓ Result: {detected} ({confidence:.0f}% confidence)")
+        elapsed = time.monotonic() - started
+        self.last_burst = {"votes": [votes[number] for number in sorted(votes)],
+                           "detected": detected, "elapsed_s": elapsed}
+        if detected is None:
+            print(f"❌ No majority after {len(votes)} vote(s), {elapsed:.2f}s")
+            return False
         
-        if detected == expected_color and confidence >= 50:
+        print(f"✓ Result: {detected} ({agreeing}/{min(frames, len(votes))} votes, {elapsed:.2f}s)")
+        if detected == expected_color:
             print("✅ Correct pouch!")
             return True
         else:
-            print("❌ Wrong or unclear pouch")
+            print("❌ Wrong pouch")
             return False
     
+    @staticmethod
+    def _majority(votes, frames):
+        """(color, count) when most of the last `frames` votes agree, else (None, 0)"""
+        recent = [votes[number]["color"] for number in sorted(votes)[-frames:]]
+        counts = {}
+        for color in recent:
+            if color:
+                counts[color] = counts.get(color, 0) + 1
+        if counts:
+            color = max(counts, key=counts.get)
+            if counts[color] > frames // 2:
+                return color, counts[color]
+        return None, 0
+    
     def capture_verification_image(self, filename="verification.jpg"):
         """Save verification photo"""
         if not self.cap:
             return False
         
         try:
-            ret, frame = self.cap.read()
-            if ret:
+            frame = self._read_frame()
+            if frame is not None:
                 cv2.imwrite(filename, frame)
                 print(f"📸 Saved: {filename}")
                 return True
@@ -197,6 +397,9 @@ Focus on medication pouches or containers if visible."""
     def cleanup(self):
         """Clean up resources"""
         try:
+            if self.grabber:
+                self.grabber.stop()
+                self.grabber = None
             if self.cap:
                 self.cap.release()
                 print("✓ Camera cleaned up")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Removes the start cue from audio captured while it plays
+"""
+
+import numpy as np
+
+
+class CueCanceller:
+    """Subtracts a known cue from the microphone signal, then gates what's left
+
+    The cue's delay and level in the capture are found by cross-correlation
+    against the cue samples, and the scaled cue is subtracted. Frames where
+    the residual is no louder than the subtraction is expected to leave
+    behind (a small share of the echo) are then attenuated, which also
+    removes leftover reverb. Speech stays above that level even when the
+    speaker's echo is louder. Chunks overlapping the cue are held back until
+    the whole cue window has been captured; everything else passes straight
+    through.
+    """
+
+    MIN_CORRELATION = 0.3  # Below this the cue isn't audible in the mic
+    GATE_RATIO = 10 ** (-15 / 10)  # Expected subtraction error, as a share of the echo energy (-15 dB)
+    GATE_GAIN = 0.1  # Attenuation applied to gated frames
+
+    def __init__(self, cue, cue_position, sample_rate=16000, sample_width=2,
+                 search_before_ms=50, search_after_ms=300, frame_ms=20):
+        self.cue = np.asarray(cue, dtype=np.float32)
+        self.cue_position = cue_position
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.window_start = cue_position - int(sample_rate * search_before_ms / 1000) * sample_width
+        self.max_lag = int(sample_rate * (search_before_ms + search_after_ms) / 1000)
+        self.window_end = self.window_start + (len(self.cue) + self.max_lag) * sample_width
+        self.held = []  # (position, data) chunks waiting for the window to fill
+        self.result = None
+
+    def process(self, position, data):
+        """Feed one captured chunk; returns the (position, data) chunks now ready"""
+        end = position + len(data)
+        if self.result is not None or end <= self.window_start:
+            return [(position, data)]
+
+        self.held.append((position, data))
+        if end < self.window_end:
+            return []
+        return self.flush()
+
+    def flush(self):
+        """Cancel the cue in whatever is held and release it"""
+        held, self.held = self.held, []
+        if not held:
+            return []
+        if self.result is None:
+            held = self._cancel(held)
+        return held
+
+    def _cancel(self, held):
+        block_start = held[0][0]
+        captured = np.frombuffer(b''.join(data for _, data in held), dtype='<i2').astype(np.float32)
+
+        offset = max(0, (self.window_start - block_start) // self.sample_width)
+        segment = captured[offset:]
+        n = len(self.cue)
+        self.result = {"found": False}
+        if len(segment) < n or not np.any(self.cue):
+            return held
+
+        # Normalised cross-correlation over every candidate delay
+        lags = min(self.max_lag, len(segment) - n) + 1
+        dots = np.correlate(segment[:n + lags - 1], self.cue, mode='valid')
+        energy = np.convolve(segment[:n + lags - 1] ** 2, np.ones(n), mode='valid')
+        cue_norm = np.sqrt(np.dot(self.cue, self.cue))
+        correlation = dots / (cue_norm * np.sqrt(np.maximum(energy, 1e-9)))
+
+        lag = int(np.argmax(correlation))
+        gain = float(dots[lag] / (cue_norm * cue_norm))
+        self.result = {
+            "found": bool(correlation[lag] >= self.MIN_CORRELATION),
+            "delay_ms": self._delay_ms(block_start + (offset + lag) * self.sample_width),
+            "correlation": float(correlation[lag]),
+            "gain": gain,
+            "gated_frames": 0,
+        }
+        if not self.result["found"]:
+            return held
+
+        start = offset + lag
+        echo = gain * self.cue
+        cleaned = captured.copy()
+        cleaned[start:start + n] -= echo
+
+        # Gate frames where no more than the expected subtraction error remains
+        for frame_start in range(0, n - self.frame_length + 1, self.frame_length):
+            echo_frame = echo[frame_start:frame_start + self.frame_length]
+            begin = start + frame_start
+            residual = cleaned[begin:begin + self.frame_length]
+            if np.dot(residual, residual) < self.GATE_RATIO * np.dot(echo_frame, echo_frame):
+                cleaned[begin:begin + self.frame_length] *= self.GATE_GAIN
+                self.result["gated_frames"] += 1
+
+        pcm = np.clip(cleaned, -32768, 32767).astype('<i2').tobytes()
+        chunks = []
+        cursor = 0
+        for position, data in held:
+            chunks.append((position, pcm[cursor:cursor + len(data)]))
+            cursor += len(data)
+        return chunks
+
+    def _delay_ms(self, position):
+        """Time from starting the cue to hearing it, in milliseconds"""
+        return (position - self.cue_position) / self.sample_width * 1000 / self.sample_rate
@@ -0,0 +1,824 @@
+#!/usr/bin/env python3
+"""
+Shared core of the assistive voice device
+
+main.py and hardware.py are thin entry points that pick which features to
+build the device with. Each feature imports what it needs (PyAudio,
+Porcupine, pygame, OpenCV) only when it starts or is first used, so a
+build without the camera never loads OpenCV.
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+import threading
+import contextlib
+
+import requests
+
+from pcm_frames import PCMFrameConverter
+from vad import VoiceActivityEndpointer
+from cue_canceller import CueCanceller
+from audio_buffers import new_audio_buffer, buffer_size
+from audio_codec import encode_upload, codec_for_link
+from http_session import create_session
+from backend_pool import BackendPool
+from retry_policy import RetryPolicy, DeadlineExceeded
+from device_runtime import DeviceRuntime, StageCancelled
+from latency_metrics import LatencyMetrics
+from memory_budget import MemoryBudget
+from wake_gate import EnergyGate, ListeningMeter, process_cpu_seconds
+
+ACCESS_KEY = "aTRQds8oKftWuELFLg0zYA1gat1XVahB5lfPu/K8lVOGuvrmVWGlLg=="
+WAKE_WORD_PATH = "wake_words/Oe-Babu_en_raspberry-pi_v3_0_0.ppn"
+
+
+class DeviceFeature:
+    """A capability the device can be built with
+
+    start() runs once at boot, in dependency order; stop() at shutdown.
+    Modules only this feature uses are imported inside its methods.
+    """
+
+    name = None
+    requires = ()
+
+    def __init__(self, device):
+        self.device = device
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class ConversationFeature(DeviceFeature):
+    """Microphone, wake word and speaker: listen, ask the backend, answer"""
+
+    name = "conversation"
+
+    def start(self):
+        import pygame
+        import pyaudio
+        import pvporcupine
+        from audio_capture import AudioCaptureStream
+        from playback import PlaybackController
+        from sound_bank import SoundBank, RESPONSE_CHANNEL
+        from streaming_player import StreamingPlayer
+
+        device = self.device
+
+        # Decode every cue once so playback needs no disk I/O
+        pygame.mixer.pre_init(frequency=22050, size=-16, channels=1, buffer=512)
+        pygame.mixer.init()
+        device.playback = PlaybackController()  # Wakes waiters when a sound ends
+        device.sound_bank = SoundBank(device.SOUNDS_DIR, device.playback)
+        device.sound_bank.preload()
+        device.sound_bank.samples("start.wav", device.SAMPLE_RATE)  # Reference for cue cancelling
+        device.memory.register("sounds", device.sound_bank.release, device.sound_bank.is_loaded)
+        device.response_player = StreamingPlayer(channel_id=RESPONSE_CHANNEL)  # Plays replies as they download
+
+        # Suppress ALSA's probe noise while PyAudio enumerates devices
+        device.FORMAT = pyaudio.paInt16
+        with contextlib.redirect_stderr(open(os.devnull, 'w')):
+            device.audio = pyaudio.PyAudio()
+
+        # Single always-open capture stream shared by wake word and recording
+        device.capture = AudioCaptureStream(
+            device.audio, rate=device.SAMPLE_RATE, channels=device.CHANNELS,
+            format=device.FORMAT
+        )
+        device.capture.start()
+        print("✓ Audio systems ready")
+
+        device.porcupine = pvporcupine.create(
+            access_key=ACCESS_KEY,
+            keyword_paths=device.KEYWORD_PATHS
+        )
+        if device.LOW_POWER:
+            device.wake_gate = EnergyGate(device.porcupine.frame_length, sample_rate=device.SAMPLE_RATE)
+        print(f"✓ Wake word detection ready{' (low-power energy gate)' if device.wake_gate else ''}")
+
+    def stop(self):
+        device = self.device
+        if device.response_player:
+            device.response_player.stop()
+            device.playback.stop(device.response_player.channel_id)
+        if device.sound_bank:
+            device.sound_bank.stop()
+
+        if device.porcupine:
+            device.porcupine.delete()
+        if device.capture:
+            device.capture.close()
+        if device.audio:
+            device.audio.terminate()
+
+        if "pygame" in sys.modules:
+            sys.modules["pygame"].mixer.quit()
+
+
+class CameraFeature(DeviceFeature):
+    """Pouch camera, opened (and OpenCV imported) the first time it's needed"""
+
+    name = "camera"
+
+    def __init__(self, device):
+        super().__init__(device)
+        self.detector = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        # Closed again when idle; reopened by the next get()
+        self.device.memory.register("camera", self.release, lambda: self.detector is not None)
+
+    def prepare(self):
+        """Open the camera in the background, ahead of the first use"""
+        threading.Thread(target=self.get, daemon=True).start()
+
+    def get(self):
+        """The ColorDetector, created on first call and grabbing frames; None if it failed"""
+        self.device.memory.touch("camera")
+        with self.lock:
+            if self.detector is None:
+                try:
+                    from color_detection import ColorDetector
+                    self.detector = ColorDetector()
+                except Exception as e:
+                    print(f"⚠️  Camera unavailable: {e}")
+            else:
+                self.detector.resume()
+            return self.detector
+
+    def pause(self):
+        """Stop grabbing frames until the next get(); the camera stays open"""
+        with self.lock:
+            if self.detector:
+                self.detector.pause()
+
+    def release(self):
+        """Close the camera; OpenCV itself stays imported"""
+        with self.lock:
+            detector, self.detector = self.detector, None
+        if detector:
+            detector.cleanup()
+
+    def stop(self):
+        self.release()
+
+
+class MedicationFeature(DeviceFeature):
+    """Medication reminders, confirmed by showing the pouch to the camera"""
+
+    name = "medication"
+    requires = ("camera",)
+
+    def __init__(self, device):
+        super().__init__(device)
+        self.scheduler = None
+
+    def start(self):
+        from medication_scheduler import MedicationScheduler
+        try:
+            self.scheduler = MedicationScheduler()
+            self.scheduler.start_scheduler()
+            self.device.medication_scheduler = self.scheduler
+            print("✓ Medication system ready")
+        except Exception as e:
+            print(f"⚠️  Medication system failed: {e}")
+            print("   Continuing with basic functionality")
+
+    def stop(self):
+        if self.scheduler:
+            self.scheduler.stop_scheduler()
+
+
+FEATURES = {
+    feature.name: feature
+    for feature in (ConversationFeature, CameraFeature, MedicationFeature)
+}
+
+
+class AssistiveVoiceDevice:
+    def __init__(self, features=("conversation",), verbose=False):
+        # Audio settings
+        self.SAMPLE_RATE = 16000
+        self.CHUNK_SIZE = 320  # 20 ms at 16 kHz
+        self.CHANNELS = 1
+        self.FORMAT = None  # pyaudio.paInt16, set when PyAudio is loaded
+        self.PREROLL_MS = 300  # Audio kept from just before the wake word
+        self.MAX_RECORD_SECONDS = 8.0  # Hard cap on one recording
+        self.TRAILING_SILENCE_MS = 1000  # Silence that ends a recording
+        # Low-power listening: Porcupine only sees frames above the noise floor
+        self.LOW_POWER = os.getenv("BABU_LOW_POWER", "0") == "1"
+        self.GATE_BLOCK_FRAMES = 4  # Frames read per wakeup in low-power mode (128 ms)
+
+        # File paths
+        self.SOUNDS_DIR = "sound"
+        self.KEYWORD_PATHS = [WAKE_WORD_PATH]
+
+        # Backend configuration
+        # Comma-separated backend hosts; requests go to the fastest healthy one
+        self.BACKEND_URLS = [url.strip() for url in
+                             os.getenv("BABU_BACKEND_URLS", "http://172.19.218.78:5000").split(",") if url.strip()]
+        self.HEDGE_AFTER_S = float(os.getenv("BABU_HEDGE_AFTER_S", "0")) or None  # 0 = no hedged uploads
+        self.BACKEND_DEADLINE_S = float(os.getenv("BABU_BACKEND_DEADLINE_S", "25"))  # Longest wait before the error cue
+        self.LINK_QUALITY = os.getenv("BABU_LINK_QUALITY", "good")  # "good" or "poor" (weak Wi-Fi / GSM)
+        self.UPLOAD_CODEC = codec_for_link(self.LINK_QUALITY)  # FLAC, or Opus on poor links
+        # Raw PCM streaming only pays off on a fast link; poor links send compressed files
+        self.STREAMING_UPLOAD = self.LINK_QUALITY == "good"
+        self.STREAM_BATCH_CHUNKS = 5  # 100 ms of audio per HTTP chunk
+
+        self.verbose = verbose  # Extra diagnostics for bring-up on new hardware
+
+        # Core components (set up by the conversation feature)
+        self.audio = None
+        self.capture = None
+        self.porcupine = None
+        self.wake_gate = None  # EnergyGate in low-power mode
+        self.listening = ListeningMeter()  # CPU per hour spent listening
+        self.playback = None  # Wakes waiters when a sound ends
+        self.sound_bank = None  # UI cues decoded once at startup
+        self.response_player = None  # Plays replies as they download
+        self.wake_position = None
+        self.start_cue = None  # (samples, capture position) of a cue playing under the recording
+        self.last_stop_reason = None
+        self.session = create_session()  # Keep-alive pool for all backend calls
+        self.backends = BackendPool(self.session, self.BACKEND_URLS, hedge_after=self.HEDGE_AFTER_S)
+        self.retry = RetryPolicy(deadline=self.BACKEND_DEADLINE_S)  # Timeouts and retries for uploads
+        self.recording = None  # Encoded last utterance, kept in memory
+        self.recording_name = None
+        self.recording_mimetype = None
+        self.is_running = False
+        self.cancel_event = threading.Event()  # Set when the runtime cancels a stage
+        self.metrics = LatencyMetrics()  # Per-stage latency, file + Prometheus
+        self.memory = MemoryBudget()  # Releases idle camera/sounds, tracks RSS
+        self.trace = None  # LatencyTrace of the running session
+
+        # Medication system (set up by the medication feature)
+        self.medication_scheduler = None
+        self.medication_mode = False
+        self.pending_medication = None
+
+        self.features = self._resolve_features(features)
+        self._setup_components()
+
+    def _resolve_features(self, names):
+        """Feature instances by name, dependencies first"""
+        resolved = {}
+
+        def add(name):
+            if name in resolved:
+                return
+            if name not in FEATURES:
+                raise ValueError(f"Unknown feature: {name}")
+            for dependency in FEATURES[name].requires:
+                add(dependency)
+            resolved[name] = FEATURES[name](self)
+
+        # The wake word loop is what every other feature hangs off
+        for name in ("conversation",) + tuple(names):
+            add(name)
+        return resolved
+
+    def feature(self, name):
+        """An enabled feature, or None"""
+        return self.features.get(name)
+
+    def _setup_components(self):
+        """Start every enabled feature, then metrics and backend probes"""
+        try:
+            for feature in self.features.values():
+                feature.start()
+            self.metrics.add_gauge("babu_rss_bytes", "Resident memory of the device process", self.memory.sample)
+            self.metrics.add_gauge("babu_rss_peak_bytes", "Highest resident memory seen", lambda: self.memory.peak_rss)
+            self.metrics.add_gauge("babu_memory_budget_bytes", "Configured memory budget", lambda: self.memory.budget_bytes)
+            self.metrics.add_gauge("babu_listen_cpu_seconds_per_hour", "CPU seconds per hour of wake word listening",
+                                   self.listening.cpu_per_hour)
+            self.metrics.add_gauge("babu_process_cpu_seconds_total", "User + system CPU of the device process",
+                                   process_cpu_seconds, kind="counter")
+            self._add_audio_health_gauges()
+            if self.wake_gate:
+                self.metrics.add_gauge("babu_wake_gate_pass_ratio", "Fraction of frames the energy gate sent to Porcupine",
+                                       lambda: self.wake_gate.pass_ratio)
+            self.metrics.serve()
+            self.memory.start()
+            self.backends.start()
+            print(f"✓ All components initialized ({', '.join(self.features)})")
+        except Exception as e:
+            print(f"✗ Setup error: {e}")
+            sys.exit(1)
+
+    def play_sound(self, sound_file, loop=False, blocking=True):
+        """Play a cue from the sound bank"""
+        self.memory.touch("sounds")
+        try:
+            self.sound_bank.play(sound_file, loop=loop, blocking=blocking)
+        except Exception as e:
+            print(f"✗ Sound error: {e}")
+
+    def stop_sound(self):
+        """Stop looped sounds"""
+        if self.sound_bank:
+            self.sound_bank.stop_loop()
+
+    def _add_audio_health_gauges(self):
+        """Export dropped-audio counters and when each last happened (0 = never)"""
+        capture, player = self.capture, self.response_player
+        for name, help_text, read, kind in (
+            ("babu_capture_overflows_total", "Capture callbacks that reported an input overflow",
+             lambda: capture.overflows, "counter"),
+            ("babu_capture_last_overflow_timestamp_seconds", "Unix time of the last input overflow",
+             lambda: capture.last_overflow_time or 0, "gauge"),
+            ("babu_capture_dropped_bytes_total", "Captured bytes overwritten before a reader got to them",
+             lambda: capture.ring.dropped_bytes, "counter"),
+            ("babu_capture_stalls_total", "Times the capture stream stopped delivering audio and was reopened",
+             lambda: capture.stalls, "counter"),
+            ("babu_capture_last_stall_timestamp_seconds", "Unix time of the last capture stall",
+             lambda: capture.last_stall_time or 0, "gauge"),
+            ("babu_playback_underruns_total", "Times reply playback ran dry before the download finished",
+             lambda: player.total_underruns, "counter"),
+            ("babu_playback_last_underrun_timestamp_seconds", "Unix time of the last playback underrun",
+             lambda: player.last_underrun_time or 0, "gauge"),
+        ):
+            self.metrics.add_gauge(name, help_text, read, kind=kind)
+
+    def detect_wake_word(self):
+        """Listen for wake word using Porcupine
+
+        In low-power mode the capture is read a block of frames per wakeup
+        and only frames that pass the energy gate are run through Porcupine.
+        """
+        print("🎧 Listening for wake word...")
+        self.listening.start()
+
+        try:
+            gate = self.wake_gate
+            block = self.porcupine.frame_length * (self.GATE_BLOCK_FRAMES if gate else 1)
+            reader = self.capture.reader()
+            frames = PCMFrameConverter(self.porcupine.frame_length)
+            if gate:
+                gate.restart()
+
+            while self.is_running and not self.cancel_event.is_set():
+                data = reader.read(block)
+                if data is None:
+                    continue
+                candidates = gate.process(data, reader.position) if gate else [(reader.position, data)]
+
+                for position, frame in candidates:
+                    keyword_index = self.porcupine.process(frames.convert(frame))
+                    if keyword_index >= 0:
+                        print("🎯 Wake word detected!")
+                        self.wake_position = position
+                        # Open the backend connection while start.wav plays
+                        self.backends.warm()
+                        self._report_listening()
+                        return True
+
+            return False
+
+        except Exception as e:
+            print(f"✗ Wake word detection error: {e}")
+            return False
+        finally:
+            self.listening.stop()
+
+    def _report_listening(self):
+        """Print listening CPU cost so low-power and normal modes can be compared"""
+        self.listening.stop()
+        gated = f", {self.wake_gate.pass_ratio:.0%} of frames to Porcupine" if self.wake_gate else ""
+        print(f"🔋 Listening CPU {self.listening.cpu_per_hour():.0f} s/hour{gated}")
+
+    def play_start_cue(self):
+        """Play start.wav without waiting; recording runs underneath it"""
+        self.memory.touch("sounds")
+        samples = self.sound_bank.samples("start.wav", self.SAMPLE_RATE)
+        if samples is not None:
+            self.start_cue = (samples, self.capture.position)
+        self.play_sound("start.wav", blocking=False)
+
+    def _capture_utterance(self, start=None):
+        """Yield PCM chunks from the capture ring until the speaker stops
+
+        Capture begins at `start` (a capture position, default now) minus
+        the configured pre-roll, so words spoken right after the wake word
+        are kept. A start cue playing meanwhile is cancelled out of the audio.
+        A voice activity endpointer ends the utterance after a short silence;
+        the reason is left in self.last_stop_reason.
+        """
+        reader = self.capture.reader(start=start, preroll_ms=self.PREROLL_MS)
+        # The pre-roll is kept but not endpointed (it holds the wake word)
+        endpoint_from = self.capture.position if start is None else start
+
+        canceller = None
+        if self.start_cue:
+            samples, cue_position = self.start_cue
+            self.start_cue = None
+            canceller = CueCanceller(samples, cue_position, sample_rate=self.SAMPLE_RATE)
+
+        endpointer = VoiceActivityEndpointer(
+            sample_rate=self.SAMPLE_RATE,
+            trailing_silence_ms=self.TRAILING_SILENCE_MS,
+            max_duration_ms=int(self.MAX_RECORD_SECONDS * 1000)
+        )
+        self._calibrate_endpointer(endpointer, reader.position)
+
+        total_chunks = int(self.MAX_RECORD_SECONDS * self.SAMPLE_RATE / self.CHUNK_SIZE)
+        ended = False
+
+        for _ in range(total_chunks):
+            if ended or not self.is_running or self.cancel_event.is_set():
+                break
+
+            position = reader.position
+            data = reader.read(self.CHUNK_SIZE)
+            if data is None:
+                print("\n✗ Capture stream stalled")
+                break
+
+            ready = canceller.process(position, data) if canceller else [(position, data)]
+            for position, data in ready:
+                yield data
+                if position >= endpoint_from and endpointer.process(data):
+                    ended = True
+                    break
+
+        if canceller:
+            if not ended:
+                for _, data in canceller.flush():
+                    yield data
+            result = canceller.result
+            if result and result["found"]:
+                print(f"\n🔇 Start cue removed ({result['delay_ms']:.0f} ms delay, "
+                      f"{result['gated_frames']} frames gated)")
+            elif self.verbose:
+                print("\n   Start cue not heard by the microphone")
+
+        if self.cancel_event.is_set():
+            self.last_stop_reason = 'cancelled'
+        else:
+            self.last_stop_reason = endpointer.reason or 'max_duration'
+        print(f"\n✓ Recording complete ({self.last_stop_reason})")
+
+    def record_audio(self, start=None):
+        """Record until the speaker stops (at most 8 seconds)"""
+        print(f"🎤 Recording (up to {self.MAX_RECORD_SECONDS:.0f} seconds)...")
+
+        try:
+            frames = []
+            for data in self._capture_utterance(start):
+                frames.append(data)
+
+                elapsed = len(frames) * self.CHUNK_SIZE / self.SAMPLE_RATE
+                print(f"⏱️  {elapsed:.1f}s recorded", end='\r')
+
+            if frames and not self.cancel_event.is_set():
+                self._save_audio(frames)
+                return True
+            return False
+
+        except Exception as e:
+            print(f"✗ Recording error: {e}")
+            return False
+
+    def _calibrate_endpointer(self, endpointer, position):
+        """Seed the endpointer noise floor from the second of audio before `position`"""
+        background = self.capture.reader(start=position, preroll_ms=1000)
+        samples = min((position - background.position) // background.sample_width, self.SAMPLE_RATE)
+        if samples > 0:
+            endpointer.calibrate(background.read(samples, timeout=0))
+
+    def _save_audio(self, frames):
+        """Encode recorded frames in memory for upload"""
+        try:
+            self.cleanup_temp_files()
+            self.recording, self.recording_name, self.recording_mimetype = encode_upload(
+                frames, self.CHANNELS,
+                self.audio.get_sample_size(self.FORMAT), self.SAMPLE_RATE,
+                codec=self.UPLOAD_CODEC
+            )
+            if self.verbose:
+                print(f"💾 Audio encoded: {buffer_size(self.recording)} bytes ({self.recording_name})")
+        except Exception as e:
+            print(f"✗ Error saving audio: {e}")
+
+    def send_to_backend(self):
+        """Send the recorded audio to the backend and return its JSON response"""
+        print("📤 Sending to backend...")
+
+        if not self.recording:
+            print("✗ No audio recorded")
+            return None
+
+        try:
+            self.recording.seek(0)
+            # Bytes, so a retry, failover or hedged request can resend them
+            files = {'audio': (self.recording_name, self.recording.read(), self.recording_mimetype)}
+            if self.verbose:
+                print(f"   Sending {len(files['audio'][1])} bytes to: {self.backends.best().base_url}/audio")
+
+            # Shared policy: short connect timeout, read timeout from recent
+            # latency, jittered backoff, and a deadline for the whole call
+            response = self.retry.call(
+                lambda timeout: self.backends.post("/audio", files=files, timeout=timeout),
+                cancel_event=self.cancel_event
+            )
+            return self._backend_result(response)
+
+        except DeadlineExceeded as deadline_error:
+            print(f"✗ Backend gave no answer in time: {deadline_error}")
+            return None
+
+        except requests.exceptions.Timeout:
+            print(f"✗ Backend timeout after {self.retry.connect_timeout:.0f}s connect / "
+                  f"{self.retry.read_timeout():.0f}s read")
+            return None
+
+        except requests.exceptions.ConnectionError as conn_error:
+            print(f"✗ Cannot connect to backend ({', '.join(self.BACKEND_URLS)})")
+            if self.verbose:
+                print(f"   Error: {conn_error}")
+            return None
+
+        except Exception as e:
+            print(f"✗ Backend error: {e}")
+            return None
+
+    def _backend_result(self, response):
+        """JSON body of a 200 response, None (with the reason printed) otherwise"""
+        if self.verbose:
+            print(f"   Response status: {response.status_code}")
+
+        if response.status_code == 200:
+            try:
+                result = response.json()
+            except json.JSONDecodeError as json_error:
+                print(f"✗ Invalid JSON response: {json_error}")
+                print(f"   Raw response: {response.text[:200]}...")
+                return None
+            print("✓ Backend response received")
+            if self.verbose and "full_play_url" not in result:
+                print(f"   Response keys: {list(result.keys())}")
+            return result
+
+        if response.status_code == 404:
+            print(f"✗ Backend endpoint not found (404): {response.url}")
+        elif response.status_code == 413:
+            print(f"✗ Audio file too large (413)")
+        else:
+            print(f"✗ Backend error: {response.status_code}")
+            if self.verbose:
+                print(f"   Response: {response.text[:200]}...")
+        return None
+
+    def stream_to_backend(self, start=None, on_recorded=None):
+        """Record and upload at the same time, returning the backend response
+
+        PCM chunks are posted with chunked transfer encoding while the user is
+        still speaking. `on_recorded` runs as soon as the utterance ends. If the
+        stream breaks before the utterance is over, or the backend has no
+        streaming endpoint, the recording is finished and sent normally.
+        """
+        print("📤 Streaming to backend while recording...")
+
+        capture = self._capture_utterance(start)
+        frames = []
+        recorded = []
+
+        def finish_recording():
+            if not recorded:
+                recorded.append(time.monotonic())
+                if on_recorded:
+                    on_recorded()
+
+        def body():
+            batch = []
+            for data in capture:
+                frames.append(data)
+                batch.append(data)
+                if len(batch) >= self.STREAM_BATCH_CHUNKS:
+                    yield b''.join(batch)
+                    batch = []
+            if self.cancel_event.is_set():
+                raise StageCancelled("recording cancelled")  # Abort the upload
+            if batch:
+                yield b''.join(batch)
+            finish_recording()
+            # Runs once requests has written the last chunk, after capture_end
+            self._mark("upload_complete")
+
+        try:
+            # The body is generated live, so no failover or hedging
+            response = self.backends.post(
+                "/audio/stream",
+                replayable=False,
+                data=body(),
+                headers={
+                    'Content-Type': 'application/octet-stream',
+                    'X-Sample-Rate': str(self.SAMPLE_RATE),
+                    'X-Channels': str(self.CHANNELS),
+                    'X-Sample-Width': str(self.audio.get_sample_size(self.FORMAT))
+                },
+                timeout=self.retry.timeout()
+            )
+
+            if response.status_code == 200:
+                # Time from the end of the upload is the backend's own work
+                self.retry.observe(time.monotonic() - recorded[0])
+            if response.status_code != 404:
+                return self._backend_result(response)
+            print("   ⚠️  Backend has no streaming endpoint, uploading file instead")
+        except Exception as e:
+            print(f"✗ Streaming error: {e}")
+            if recorded or self.cancel_event.is_set():
+                return None
+
+        # Backend without a streaming endpoint, or the stream died mid-utterance:
+        # finish recording and fall back to a normal upload
+        for data in capture:
+            frames.append(data)
+        finish_recording()
+
+        if not frames:
+            return None
+        self._save_audio(frames)
+        return self.send_to_backend()
+
+    def play_response_audio(self, audio_url):
+        """Download and play response audio"""
+        from streaming_player import UnsupportedAudioFormat
+
+        try:
+            print("🔊 Playing response...")
+
+            response = self.session.get(audio_url, stream=True, timeout=30)
+            if response.status_code != 200:
+                print(f"✗ Download failed: {response.status_code}")
+                return False
+
+            chunks = response.iter_content(chunk_size=4096)
+            try:
+                stats = self.response_player.play(chunks)
+                if stats["first_audio_s"] is not None:
+                    self._mark("first_audio", stats["first_audio_at"])
+                    print(f"   First audio after {stats['first_audio_s']:.2f}s, "
+                          f"{stats['underruns']} underrun(s)")
+                if self.verbose:
+                    print(f"   Source: {stats['source']}, {stats['bytes']} bytes, "
+                          f"{self.response_player.total_underruns} underrun(s) this session")
+            except UnsupportedAudioFormat as e:
+                # Not PCM WAV (e.g. MP3): buffer the whole reply and let pygame decode it
+                import pygame
+
+                if self.verbose:
+                    print(f"   Not streamable PCM WAV ({e}), buffering for pygame")
+                with new_audio_buffer() as buffer:
+                    buffer.write(e.prefix)
+                    for chunk in chunks:
+                        buffer.write(chunk)
+                    buffer.seek(0)
+                    sound = pygame.mixer.Sound(file=buffer)
+
+                self.playback.play(self.response_player.channel_id, sound)
+                self._mark("first_audio")
+                self.playback.wait(self.response_player.channel_id)
+
+            print("✓ Response played")
+            return True
+
+        except Exception as e:
+            print(f"✗ Playback error: {e}")
+            return False
+
+    def cleanup_temp_files(self):
+        """Release the in-memory recording"""
+        try:
+            if self.recording:
+                self.recording.close()
+                self.recording = None
+        except Exception as e:
+            print(f"✗ Error cleaning up: {e}")
+
+    def check_medication_reminder(self):
+        """Announce a due medication reminder; True if one was announced"""
+        if not self.medication_scheduler:
+            return False
+
+        reminder = self.medication_scheduler.get_active_reminder()
+        if reminder:
+            self.pending_medication = reminder
+            self.medication_mode = True
+            # OpenCV and the camera load while the reminder plays
+            self.feature("camera").prepare()
+
+            message = self.medication_scheduler.generate_reminder_message(reminder)
+            print(f"💊 {message}")
+            self.play_sound("medication_reminder.wav", blocking=True)
+            return True
+        return False
+
+    def validate_medication_pouch(self):
+        """Validate medication pouch color"""
+        camera = self.feature("camera")
+        if not self.pending_medication or not camera:
+            return False
+
+        expected_color = self.pending_medication["color"]
+        print(f"🔍 Show {expected_color} pouch to camera...")
+
+        color_detector = camera.get()
+        if not color_detector:
+            return False
+        try:
+            # The burst keeps looking while the user brings the pouch into view
+            is_valid = color_detector.validate_pouch_color(expected_color, cancel_event=self.cancel_event)
+            if is_valid:
+                # Save verification photo
+                timestamp = time.strftime("%Y%m%d_%H%M%S")
+                color_detector.capture_verification_image(f"med_{timestamp}.jpg")
+        finally:
+            camera.pause()  # Until the next reminder
+
+        if is_valid:
+            # Mark as taken
+            self.medication_scheduler.acknowledge_reminder(self.pending_medication["id"])
+            print("✅ Correct pouch validated!")
+            return True
+        else:
+            print("❌ Wrong or no pouch detected")
+            return False
+
+    def run(self):
+        """Main application loop"""
+        print("🚀 Starting Assistive Voice Device")
+        if self.medication_scheduler:
+            print("💊 Medication reminders enabled")
+
+        self.is_running = True
+
+        try:
+            # Listening, recording, backend calls and playback run as
+            # cancellable stages of an asyncio state machine
+            asyncio.run(DeviceRuntime(self).run())
+        except KeyboardInterrupt:
+            print("\n🛑 Shutting down...")
+        except Exception as e:
+            print(f"✗ Error: {e}")
+        finally:
+            self.shutdown()
+
+    def _mark(self, stage, at=None):
+        """Timestamp a stage of the running session's latency trace"""
+        trace = self.trace
+        if trace:
+            trace.mark(stage, at)
+
+    def cancel_stage(self):
+        """Make the running blocking stage return as soon as possible"""
+        self.cancel_event.set()
+        # Stop any audio the stage may be waiting on
+        self.response_player.stop()
+        self.playback.stop(self.response_player.channel_id)
+        self.sound_bank.stop()
+
+    def shutdown(self):
+        """Clean shutdown"""
+        print("🔄 Shutting down...")
+
+        self.is_running = False
+        self.stop_sound()
+
+        # Dependents first, so the conversation feature closes audio last
+        for feature in reversed(list(self.features.values())):
+            try:
+                feature.stop()
+            except Exception as e:
+                print(f"⚠️  Error stopping {feature.name}: {e}")
+
+        self.memory.stop()
+        self.backends.close()
+        self.session.close()
+        self.metrics.close()
+
+        self.cleanup_temp_files()
+        print("✓ Shutdown complete")
+
+
+def check_assets(required_sounds):
+    """Exit if the wake word model is missing; warn about missing sounds"""
+    for directory in ["sound", "wake_words"]:
+        if not os.path.exists(directory):
+            print(f"✗ Missing directory: {directory}")
+            sys.exit(1)
+
+    if not os.path.exists(WAKE_WORD_PATH):
+        print(f"✗ Missing wake word file: {WAKE_WORD_PATH}")
+        sys.exit(1)
+
+    for sound in required_sounds:
+        if not os.path.exists(os.path.join("sound", sound)):
+            print(f"⚠️  Missing sound: {sound}")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Asyncio runtime driving the assistive voice device through its states
+"""
+
+import asyncio
+from enum import Enum
+
+from latency_metrics import LatencyTrace
+
+
+class DeviceState(Enum):
+    IDLE = "idle"
+    LISTENING = "listening"
+    RECORDING = "recording"
+    AWAITING_BACKEND = "awaiting backend"
+    PLAYING = "playing"
+    MEDICATION = "medication"
+
+
+class StageCancelled(Exception):
+    """Raised inside a blocking stage that the runtime has cancelled"""
+
+
+class DeviceRuntime:
+    """Runs a device as concurrent asyncio tasks with explicit states
+
+    Blocking device calls (audio, HTTP, camera) run in worker threads, one
+    stage at a time. Cancelling a stage sets the device's cancel event and
+    stops its audio so the worker returns promptly. Medication reminders are
+    polled by their own task, so a due reminder is announced while the
+    device is listening instead of after the current call returns.
+
+    Each session gets a LatencyTrace; the runtime marks stage boundaries and
+    the device marks what only it can see (upload done, first audio).
+    """
+
+    REMINDER_POLL_SECONDS = 1.0
+    STAGE_STOP_GRACE_SECONDS = 1.0  # Time a cancelled worker gets to wind down
+
+    def __init__(self, device):
+        self.device = device
+        self.state = DeviceState.IDLE
+        self.loop = None
+        self.session_task = None
+
+    def set_state(self, state):
+        """Enter a new state (event loop thread only)"""
+        if state != self.state:
+            print(f"🔁 {self.state.value} → {state.value}")
+            self.state = state
+
+    def set_state_threadsafe(self, state):
+        """Enter a new state from a worker thread"""
+        self.loop.call_soon_threadsafe(self.set_state, state)
+
+    def cancel(self):
+        """Abandon the current conversation or medication check; thread-safe"""
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._cancel_session)
+
+    def _cancel_session(self):
+        if self.session_task and not self.session_task.done():
+            self.session_task.cancel()
+
+    async def run(self):
+        """Listen for the wake word and run sessions until the device stops"""
+        self.loop = asyncio.get_running_loop()
+        watchers = []
+        if getattr(self.device, "medication_scheduler", None):
+            watchers.append(asyncio.create_task(self._watch_reminders()))
+
+        try:
+            while self.device.is_running:
+                detected = await self.stage(self.device.detect_wake_word, state=DeviceState.LISTENING)
+                if not detected:
+                    await asyncio.sleep(0.1)  # Detection error; don't spin
+                    continue
+
+                kind = "medication" if getattr(self.device, "medication_mode", False) else "conversation"
+                trace = LatencyTrace(kind)
+                trace.mark("wake")
+                self.session_task = asyncio.create_task(self._session(trace))
+                await asyncio.wait({self.session_task})
+        finally:
+            self._cancel_session()
+            for task in watchers:
+                task.cancel()
+            pending = watchers + ([self.session_task] if self.session_task else [])
+            await asyncio.gather(*pending, return_exceptions=True)
+            self.set_state(DeviceState.IDLE)
+
+    async def stage(self, func, *args, state=None):
+        """Run one blocking device call in a worker thread and return its result"""
+        if state:
+            self.set_state(state)
+        self.device.cancel_event.clear()
+        worker = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        try:
+            return await asyncio.shield(worker)
+        except asyncio.CancelledError:
+            self.device.cancel_stage()
+            await asyncio.wait({worker}, timeout=self.STAGE_STOP_GRACE_SECONDS)
+            raise
+
+    async def _session(self, trace):
+        """One wake-word-triggered interaction"""
+        device = self.device
+        device.trace = trace
+        try:
+            if trace.kind == "medication":
+                trace.ok = await self._medication_check()
+            else:
+                trace.ok = await self._conversation()
+        except asyncio.CancelledError:
+            print("⏹️  Session cancelled")
+            raise
+        except Exception as e:
+            print(f"✗ Session error: {e}")
+            await self._fail()
+        finally:
+            device.stop_sound()
+            device.cleanup_temp_files()
+            device.trace = None
+            device.metrics.record(trace)
+
+    async def _conversation(self):
+        """Record a question, get the backend's answer and play it"""
+        device = self.device
+        trace = device.trace
+        # The cue plays while recording starts; it is cancelled out of the audio
+        self.set_state(DeviceState.RECORDING)
+        device.play_start_cue()
+        trace.mark("start_cue")
+
+        if device.STREAMING_UPLOAD:
+            def on_recorded():
+                if device.cancel_event.is_set():
+                    return
+                trace.mark("capture_end")
+                self.set_state_threadsafe(DeviceState.AWAITING_BACKEND)
+                device.play_sound("waiting.wav", loop=True, blocking=False)
+
+            response = await self.stage(device.stream_to_backend, device.wake_position, on_recorded)
+        else:
+            if not await self.stage(device.record_audio, device.wake_position):
+                return await self._fail()
+            trace.mark("capture_end")
+            device.play_sound("waiting.wav", loop=True, blocking=False)
+            response = await self.stage(device.send_to_backend, state=DeviceState.AWAITING_BACKEND)
+        trace.mark("backend_response")
+
+        return await self._respond(response)
+
+    async def _medication_check(self):
+        """Validate the pouch for the pending reminder, then take a question"""
+        device = self.device
+        self.set_state(DeviceState.MEDICATION)
+        try:
+            if not device.pending_medication:
+                return False
+            print(f"💊 {device.pending_medication['name']}")
+
+            if not await self.stage(device.validate_medication_pouch):
+                return await self._fail()
+
+            self.set_state(DeviceState.RECORDING)
+            device.play_start_cue()
+            device.trace.mark("start_cue")
+            if not await self.stage(device.record_audio):
+                return await self._fail()
+            device.trace.mark("capture_end")
+
+            device.play_sound("waiting.wav", loop=True, blocking=False)
+            response = await self.stage(device.send_to_backend, state=DeviceState.AWAITING_BACKEND)
+            device.trace.mark("backend_response")
+            if await self._respond(response, answer_required=False):
+                print("✅ Medication cycle complete")
+                return True
+            return False
+        finally:
+            device.medication_mode = False
+            device.pending_medication = None
+
+    async def _respond(self, response, answer_required=True):
+        """Play the backend's answer, then the ending cue"""
+        device = self.device
+        device.stop_sound()
+
+        if response and "full_play_url" in response:
+            played = await self.stage(
+                device.play_response_audio, response["full_play_url"], state=DeviceState.PLAYING
+            )
+            if not played:
+                return await self._fail()
+            device.trace.mark("playback_end")
+        elif answer_required:
+            return await self._fail()
+
+        await self.stage(device.play_sound, "ending.wav")
+        return True
+
+    async def _fail(self):
+        """Play the error cue; returns False for convenience"""
+        self.device.stop_sound()
+        await self.stage(self.device.play_sound, "error.wav")
+        return False
+
+    async def _watch_reminders(self):
+        """Announce due medication reminders whenever the device is free"""
+        while True:
+            if self.state in (DeviceState.IDLE, DeviceState.LISTENING) and not self.device.medication_mode:
+                if await asyncio.to_thread(self.device.check_medication_reminder):
+                    print("💊 Medication reminder! Waiting for wake word")
+            await asyncio.sleep(self.REMINDER_POLL_SECONDS)
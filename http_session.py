@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Shared keep-alive HTTP session for backend traffic
+"""
+
+import socket
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size=4):
+    """requests.Session with a small keep-alive connection pool"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class ConnectionWarmer:
+    """Opens a pooled connection to the backend ahead of the first request
+
+    Called when the wake word fires, so DNS resolution and the TCP handshake
+    happen while start.wav is playing and the upload starts on an open socket.
+    """
+
+    def __init__(self, session, backend_url, timeout=(3, 5)):
+        parts = urlsplit(backend_url)
+        self.session = session
+        self.base_url = f"{parts.scheme}://{parts.netloc}/"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.timeout = timeout
+        self.warm_thread = None
+
+    def warm(self):
+        """Start warming in the background; returns immediately"""
+        if self.warm_thread and self.warm_thread.is_alive():
+            return
+        self.warm_thread = threading.Thread(target=self._warm, daemon=True)
+        self.warm_thread.start()
+
+    def _warm(self):
+        """Resolve the host and leave a keep-alive connection in the pool"""
+        try:
+            socket.getaddrinfo(self.host, self.port, proto=socket.IPPROTO_TCP)
+            # Reading the (tiny) health response returns the connection to the pool
+            self.session.get(self.base_url, timeout=self.timeout).close()
+        except Exception as e:
+            print(f"⚠️  Backend pre-warm failed: {e}")
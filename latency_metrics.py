@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Per-stage latency traces, a rotating metrics file and a Prometheus endpoint
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_FILE = os.getenv("BABU_METRICS_FILE", "metrics/latency.jsonl")
+METRICS_MAX_BYTES = 256 * 1024
+METRICS_BACKUPS = 3
+METRICS_PORT = int(os.getenv("BABU_METRICS_PORT", "9101"))
+
+# Marks in the order a conversation reaches them
+STAGES = (
+    "wake",
+    "start_cue",
+    "capture_end",
+    "upload_complete",
+    "backend_response",
+    "first_audio",
+    "playback_end",
+)
+
+QUANTILES = (0.5, 0.95)
+
+
+class LatencyTrace:
+    """Monotonic timestamps for the stages of one session"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.wall_time = time.time()
+        self.marks = {}
+        self.ok = False
+
+    def mark(self, stage, at=None):
+        """Record when a stage was reached; the first mark of a stage wins"""
+        self.marks.setdefault(stage, time.monotonic() if at is None else at)
+
+    def since_wake(self):
+        """Seconds from wake detection to each later mark"""
+        wake = self.marks.get("wake")
+        if wake is None:
+            return {}
+        return {stage: at - wake for stage, at in self._ordered() if stage != "wake"}
+
+    def stage_durations(self):
+        """Seconds spent reaching each mark from the previous one"""
+        durations = {}
+        previous = None
+        for stage, at in self._ordered():
+            if previous is not None:
+                durations[stage] = at - previous
+            previous = at
+        return durations
+
+    def _ordered(self):
+        return [(stage, self.marks[stage]) for stage in STAGES if stage in self.marks]
+
+
+class LatencyMetrics:
+    """Keeps recent traces for percentiles and appends each one to a rotating file"""
+
+    def __init__(self, path=METRICS_FILE, window=500):
+        self.lock = threading.Lock()
+        self.since_wake = {}  # (kind, stage) -> deque of seconds
+        self.durations = {}
+        self.sessions = {}  # (kind, ok) -> count
+        self.window = window
+        self.gauges = []  # (name, help, read, type) sampled at scrape time
+        self.server = None
+
+        self.log = logging.getLogger("babu.latency")
+        self.log.propagate = False
+        self.log.setLevel(logging.INFO)
+        if not self.log.handlers:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                handler = RotatingFileHandler(path, maxBytes=METRICS_MAX_BYTES, backupCount=METRICS_BACKUPS)
+                self.log.addHandler(handler)
+            except OSError as e:
+                print(f"⚠️  Latency file disabled: {e}")
+
+    def record(self, trace):
+        """Store a finished trace"""
+        since_wake = trace.since_wake()
+        durations = trace.stage_durations()
+
+        with self.lock:
+            for stage, seconds in since_wake.items():
+                self.since_wake.setdefault((trace.kind, stage), deque(maxlen=self.window)).append(seconds)
+            for stage, seconds in durations.items():
+                self.durations.setdefault((trace.kind, stage), deque(maxlen=self.window)).append(seconds)
+            key = (trace.kind, trace.ok)
+            self.sessions[key] = self.sessions.get(key, 0) + 1
+
+        self.log.info(json.dumps({
+            "t": round(trace.wall_time, 1),
+            "kind": trace.kind,
+            "ok": trace.ok,
+            "ms": {stage: round(seconds * 1000) for stage, seconds in since_wake.items()},
+        }, separators=(",", ":")))
+
+        if "first_audio" in since_wake:
+            print(f"⏱️  Wake → first audio {since_wake['first_audio']:.2f}s")
+
+    def add_gauge(self, name, help_text, read, kind="gauge"):
+        """Export read() as a Prometheus gauge (or counter)"""
+        self.gauges.append((name, help_text, read, kind))
+
+    def prometheus_text(self):
+        """Current percentiles in Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            for name, help_text, samples in (
+                ("babu_since_wake_seconds", "Time from wake word to reaching each stage", self.since_wake),
+                ("babu_stage_seconds", "Time spent reaching each stage from the previous one", self.durations),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} summary")
+                for kind, stage in sorted(samples, key=lambda key: (key[0], STAGES.index(key[1]))):
+                    values = sorted(samples[(kind, stage)])
+                    labels = f'kind="{kind}",stage="{stage}"'
+                    for q in QUANTILES:
+                        lines.append(f'{name}{{{labels},quantile="{q}"}} {_quantile(values, q):.4f}')
+                    lines.append(f'{name}_sum{{{labels}}} {sum(values):.4f}')
+                    lines.append(f'{name}_count{{{labels}}} {len(values)}')
+
+            lines.append("# HELP babu_sessions_total Sessions run since start")
+            lines.append("# TYPE babu_sessions_total counter")
+            for (kind, ok), count in sorted(self.sessions.items()):
+                lines.append(f'babu_sessions_total{{kind="{kind}",ok="{str(ok).lower()}"}} {count}')
+
+        for name, help_text, read, kind in self.gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {read()}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=METRICS_PORT, host="0.0.0.0"):
+        """Expose /metrics over HTTP from a background thread"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"⚠️  Metrics endpoint disabled: {e}")
+            return
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"✓ Metrics on :{port}/metrics")
+
+    def close(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+        for handler in self.log.handlers:
+            handler.close()
+
+
+def _quantile(sorted_values, q):
+    """Nearest-rank quantile of an already sorted list"""
+    index = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[index]
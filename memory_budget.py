@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Memory budget: releases idle heavy resources and tracks resident memory
+"""
+
+import gc
+import os
+import time
+import ctypes
+import ctypes.util
+import resource
+import threading
+
+MEMORY_BUDGET_MB = float(os.getenv("BABU_MEMORY_BUDGET_MB", "160"))
+MEMORY_IDLE_S = float(os.getenv("BABU_MEMORY_IDLE_S", "300"))
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+    _malloc_trim = _libc.malloc_trim
+except (OSError, AttributeError):
+    _malloc_trim = None  # Not glibc; freed memory returns to the OS on its own schedule
+
+
+def rss_bytes():
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No procfs (not Linux): peak RSS is the best available figure
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def trim_heap():
+    """Collect garbage and hand freed heap pages back to the OS"""
+    gc.collect()
+    if _malloc_trim:
+        _malloc_trim(0)
+
+
+class MemoryBudget:
+    """Releases resources nobody has used for a while and watches RSS
+
+    Owners register each releasable resource with a `release` callback and
+    an `is_loaded` check, and call touch() whenever they use it. Resources
+    reload themselves on their next use. Every `check_interval` seconds a
+    background thread releases anything idle for `idle_seconds`. If RSS is
+    over `budget_mb`, it also releases resources not used since the last
+    check, least recently used first, until RSS is back under budget.
+    """
+
+    def __init__(self, budget_mb=MEMORY_BUDGET_MB, idle_seconds=MEMORY_IDLE_S, check_interval=None):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.idle_seconds = idle_seconds
+        self.check_interval = check_interval or max(1.0, min(60.0, idle_seconds / 4))
+        self.resources = {}  # name -> (release, is_loaded)
+        self.last_used = {}
+        self.releases = {}  # name -> times released
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.rss = rss_bytes()
+        self.peak_rss = self.rss
+        self.over_budget = 0  # Checks that found RSS over budget
+
+    def register(self, name, release, is_loaded):
+        with self.lock:
+            self.resources[name] = (release, is_loaded)
+            self.last_used[name] = time.monotonic()
+            self.releases.setdefault(name, 0)
+
+    def touch(self, name):
+        """Note that a resource is in use (and will be reloaded if released)"""
+        self.last_used[name] = time.monotonic()
+
+    def start(self):
+        if self.thread:
+            return
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        print(f"✓ Memory budget {self.budget_bytes / 2**20:.0f} MB, "
+              f"idle release after {self.idle_seconds:.0f}s (RSS {self.rss / 2**20:.0f} MB)")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+    def check(self):
+        """Release idle resources (or everything, if over budget); returns RSS"""
+        now = time.monotonic()
+        with self.lock:
+            loaded = [(self.last_used[name], name) for name, (_, is_loaded) in self.resources.items()
+                      if is_loaded()]
+        loaded.sort()
+
+        released = [name for used, name in loaded if now - used >= self.idle_seconds]
+        for name in released:
+            self._release(name)
+        # Buffers freed since the last check (recordings, replies) go back too
+        trim_heap()
+
+        rss = self.sample()
+        if rss > self.budget_bytes:
+            self.over_budget += 1
+            for used, name in loaded:
+                if rss <= self.budget_bytes:
+                    break
+                if name in released or now - used < self.check_interval:
+                    continue  # Already gone, or possibly still in use
+                print(f"⚠️  RSS {rss / 2**20:.0f} MB over budget, releasing {name}")
+                self._release(name)
+                trim_heap()
+                rss = self.sample()
+        return rss
+
+    def sample(self):
+        """Measure RSS now"""
+        self.rss = rss_bytes()
+        self.peak_rss = max(self.peak_rss, self.rss)
+        return self.rss
+
+    def _release(self, name):
+        release, _ = self.resources[name]
+        try:
+            release()
+            self.releases[name] += 1
+        except Exception as e:
+            print(f"⚠️  Could not release {name}: {e}")
+
+    def _run(self):
+        while not self.stop_event.wait(self.check_interval):
+            self.check()
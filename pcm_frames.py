@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+PCM frame conversion for wake word detection
+"""
+
+import sys
+from array import array
+
+
+class PCMFrameConverter:
+    """Turn raw 16-bit PCM bytes into a sample sequence without per-sample work.
+
+    One int16 buffer is allocated up front and reused for every frame, so the
+    wake word loop does a single memmove per frame instead of building a new
+    Python list of ints.
+    """
+
+    def __init__(self, frame_length):
+        self.frame_length = frame_length
+        self.frame_bytes = frame_length * 2
+        self._frame = array('h', bytes(self.frame_bytes))
+        self._frame_raw = memoryview(self._frame).cast('B')
+        self._swap_bytes = sys.byteorder != 'little'
+
+    def convert(self, data):
+        """Copy one frame of little-endian PCM into the shared buffer
+
+        The returned array is overwritten by the next call, so consume it
+        (e.g. pass it to Porcupine) before converting another frame.
+        """
+        if len(data) != self.frame_bytes:
+            raise ValueError(
+                f"Expected {self.frame_bytes} bytes, got {len(data)}"
+            )
+
+        self._frame_raw[:] = data
+        if self._swap_bytes:
+            self._frame.byteswap()
+        return self._frame
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Playback completion tracking without get_busy() polling
+"""
+
+import time
+import threading
+
+import pygame
+
+
+class PlaybackController:
+    """Plays Sounds on mixer channels and wakes waiters the moment they end
+
+    The end of each sound is known from its length when it starts, so waiters
+    sleep on a condition variable until then. Stopping or replacing the sound
+    on a channel notifies them immediately.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.deadlines = {}  # channel id -> monotonic end time (None = looping)
+        self.generations = {}  # channel id -> play count, to detect replacement
+
+    def play(self, channel_id, sound, loops=0):
+        """Start a sound on a channel; returns immediately"""
+        pygame.mixer.Channel(channel_id).play(sound, loops=loops)
+        deadline = None
+        if loops >= 0:
+            deadline = time.monotonic() + sound.get_length() * (loops + 1)
+        with self.condition:
+            self.deadlines[channel_id] = deadline
+            self.generations[channel_id] = self.generations.get(channel_id, 0) + 1
+            self.condition.notify_all()
+
+    def wait(self, channel_id, timeout=None):
+        """Block until the current sound on a channel ends
+
+        Returns True when it played to the end, False if it was stopped,
+        replaced or the timeout expired first.
+        """
+        give_up = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            generation = self.generations.get(channel_id)
+            while True:
+                if self.generations.get(channel_id) != generation:
+                    return False
+                if channel_id not in self.deadlines:
+                    return False
+                deadline = self.deadlines[channel_id]
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    return True
+                if give_up is not None and now >= give_up:
+                    return False
+
+                wake = [t for t in (deadline, give_up) if t is not None]
+                self.condition.wait(min(wake) - now if wake else None)
+
+    def stop(self, channel_id):
+        """Stop a channel and release anyone waiting on it"""
+        pygame.mixer.Channel(channel_id).stop()
+        with self.condition:
+            self.deadlines.pop(channel_id, None)
+            self.condition.notify_all()
+
+    def is_playing(self, channel_id):
+        """True while a started sound has not reached its end"""
+        with self.condition:
+            if channel_id not in self.deadlines:
+                return False
+            deadline = self.deadlines[channel_id]
+            return deadline is None or time.monotonic() < deadline
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Local medication pouch color classifier (HSV ranges + contour shape)
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+# Below this the caller should ask a better (remote) classifier
+POUCH_LOCAL_CONFIDENCE = float(os.getenv("BABU_POUCH_LOCAL_CONFIDENCE", "0.5"))
+
+
+class PouchClassifier:
+    """Finds the most pouch-like single-colored region in a BGR frame
+
+    Based on MedicineAssistant.detect_pouch_color, which ran a full mask,
+    morphology and contour pipeline per color. Here every pixel is labelled
+    in one pass: each color is a box (or two, for red) in HSV, so the 3D
+    HSV -> label lookup factors into one 256-entry bit table per channel;
+    the three looked-up planes are ANDed and mapped to labels. The colored
+    pixels get one close/open, then connectedComponentsWithStats finds the
+    candidate regions, and all of them are shape-scored at once from the
+    component stats.
+
+    A region's color is its most common label and counts when that color
+    covers more than 40% of it. Regions are scored on area, squareness and
+    how much of their bounding box they fill. Regions larger than half the
+    frame are background (a table or wall), not a pouch. Compared with the
+    original, red also takes the top end of the hue circle (170-180) and
+    needs saturation 100 like yellow, since wood and skin are dull reds.
+
+    Confidence is the winner's fit (color share × shape score) minus half
+    the best fit of any other color, so a frame with two plausible pouches
+    of different colors scores low.
+    """
+
+    COLOR_RANGES = {
+        'green': [([40, 50, 50], [80, 255, 255])],
+        'yellow': [([20, 100, 100], [30, 255, 255])],
+        'blue': [([100, 50, 50], [130, 255, 255])],
+        'red': [([0, 100, 50], [10, 255, 255]), ([170, 100, 50], [180, 255, 255])],
+        'white': [([0, 0, 200], [180, 30, 255])],
+    }
+    MIN_AREA = 2000
+    MAX_FRAME_SHARE = 0.5
+    MIN_SCORE = 0.3
+    MIN_COLOR_SHARE = 0.4
+
+    def __init__(self):
+        self.kernel = np.ones((5, 5), np.uint8)
+        self.colors = [None] + list(self.COLOR_RANGES)  # Label -> color name
+        self.channel_luts, self.label_lut = self._build_luts()
+        self.last_regions = {}  # color -> best region info from the last frame
+
+    def _build_luts(self):
+        """Box bits for each H, S and V value, and box bits -> label"""
+        channel_luts = np.zeros((3, 256), np.uint8)
+        label_lut = np.zeros(256, np.uint8)
+        box_labels = []
+        for label, color in enumerate(self.colors[1:], start=1):
+            for lower, upper in self.COLOR_RANGES[color]:
+                bit = 1 << len(box_labels)
+                for channel in range(3):
+                    channel_luts[channel, lower[channel]:upper[channel] + 1] |= bit
+                box_labels.append(label)
+
+        # Pixels in overlapping boxes go to the color listed first
+        for bits in range(1, 256):
+            for index, label in enumerate(box_labels):
+                if bits & (1 << index):
+                    label_lut[bits] = label
+                    break
+        return list(channel_luts), label_lut
+
+    def label_map(self, frame):
+        """Color label of every pixel (0 = none of the pouch colors)"""
+        hue, saturation, value = cv2.split(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV))
+        hue_lut, saturation_lut, value_lut = self.channel_luts
+        bits = cv2.bitwise_and(cv2.LUT(hue, hue_lut), cv2.LUT(saturation, saturation_lut))
+        bits = cv2.bitwise_and(bits, cv2.LUT(value, value_lut), dst=bits)
+        return cv2.LUT(bits, self.label_lut)
+
+    def classify(self, frame):
+        """Returns (color or None, confidence 0-1)"""
+        labels = self.label_map(frame)
+        mask = cv2.morphologyEx((labels > 0).view(np.uint8), cv2.MORPH_CLOSE, self.kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+
+        # Grana's block-based labelling: the fastest 8-connected algorithm here
+        count, components, stats, _ = cv2.connectedComponentsWithStatsWithAlgorithm(
+            mask, 8, cv2.CV_32S, cv2.CCL_GRANA
+        )
+        regions = self._score_regions(count, components, stats, labels)
+
+        self.last_regions = regions
+        if not regions:
+            return None, 0.0
+
+        ranked = sorted(regions.items(), key=lambda item: item[1]['fit'], reverse=True)
+        color, best = ranked[0]
+        runner_up = ranked[1][1]['fit'] if len(ranked) > 1 else 0.0
+        confidence = max(0.0, min(1.0, best['fit'] - 0.5 * runner_up))
+        return color, confidence
+
+    def _score_regions(self, count, components, stats, labels):
+        """Best-fitting region of each color
+
+        Shape is scored for every component at once from its stats; only
+        the few that pass get a label histogram over their bounding box.
+        """
+        stats = stats[1:].astype(np.float64)  # Row 0 is the background
+        area = stats[:, cv2.CC_STAT_AREA]
+        w = stats[:, cv2.CC_STAT_WIDTH]
+        h = stats[:, cv2.CC_STAT_HEIGHT]
+
+        area_score = np.minimum(area / 10000, 1.0)
+        aspect_score = 1.0 - np.abs(w / h - 1.0)  # Prefer square shapes
+        extent_score = area / (w * h)  # How much of the box is filled
+        score = area_score * 0.4 + aspect_score * 0.3 + extent_score * 0.3
+        candidates = np.flatnonzero((area >= self.MIN_AREA) & (area <= labels.size * self.MAX_FRAME_SHARE)
+                                    & (score > self.MIN_SCORE))
+
+        regions = {}
+        for index in candidates:
+            x, y, width, height = (int(v) for v in stats[index, :4])
+            inside = components[y:y + height, x:x + width] == index + 1
+            histogram = np.bincount(labels[y:y + height, x:x + width][inside], minlength=len(self.colors))
+            label = int(histogram[1:].argmax()) + 1
+            share = histogram[label] / area[index]
+            fit = share * score[index]
+
+            color = self.colors[label]
+            if share <= self.MIN_COLOR_SHARE or fit <= regions.get(color, {}).get('fit', 0.0):
+                continue
+            regions[color] = {
+                'share': float(share),
+                'area': float(area[index]),
+                'bbox': (x, y, width, height),
+                'score': float(score[index]),
+                'fit': float(fit),
+            }
+        return regions
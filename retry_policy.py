@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Retry policy for backend requests: adaptive timeouts, jittered backoff, deadline
+"""
+
+import time
+import random
+from collections import deque
+
+import requests
+
+RETRY_STATUSES = (502, 503, 504)  # Gateway/overload errors worth another try
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """No usable answer before the policy's total deadline"""
+
+
+class RetryPolicy:
+    """Decides timeouts and retries so a request never outlives `deadline`
+
+    The connect timeout is short and fixed: a host that doesn't accept a
+    connection in a few seconds is down. The read timeout covers the
+    backend's work (ASR + LLM + TTS), so it follows the slowest of the
+    recent successful requests times a safety factor, clamped to
+    [min_read_timeout, max_read_timeout]. Retries wait a random time up to
+    an exponentially growing cap ("full jitter"), and every attempt is cut
+    short so the whole call ends by the deadline.
+    """
+
+    MIN_ATTEMPT_SECONDS = 2.0  # A retry with less time than this left isn't worth starting
+
+    def __init__(self, deadline=25.0, max_attempts=3, connect_timeout=3.0,
+                 initial_read_timeout=20.0, min_read_timeout=8.0, max_read_timeout=25.0,
+                 latency_factor=2.0, backoff_base=0.5, backoff_cap=4.0, history=20):
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.connect_timeout = connect_timeout
+        self.initial_read_timeout = initial_read_timeout
+        self.min_read_timeout = min_read_timeout
+        self.max_read_timeout = max_read_timeout
+        self.latency_factor = latency_factor
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.latencies = deque(maxlen=history)  # Seconds per successful request
+
+    def read_timeout(self):
+        """Read timeout from recent latencies"""
+        if not self.latencies:
+            return self.initial_read_timeout
+        adaptive = max(self.latencies) * self.latency_factor
+        return min(self.max_read_timeout, max(self.min_read_timeout, adaptive))
+
+    def timeout(self, remaining=None):
+        """(connect, read) timeout tuple for requests, capped to `remaining` seconds"""
+        connect, read = self.connect_timeout, self.read_timeout()
+        if remaining is not None:
+            connect, read = min(connect, remaining), min(read, remaining)
+        return (connect, read)
+
+    def observe(self, seconds):
+        """Record how long a successful request took"""
+        self.latencies.append(seconds)
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def call(self, send, cancel_event=None):
+        """Run send(timeout) with retries and return its response
+
+        Connection errors, timeouts and 502/503/504 answers are retried. A
+        read timeout is only retried if a full read_timeout() is still left
+        before the deadline: the backend would have to redo all its work.
+        Once attempts run out, the last error response is returned or the
+        last exception raised; DeadlineExceeded if the deadline ran out
+        first. Setting `cancel_event` stops further retries.
+        """
+        deadline_at = time.monotonic() + self.deadline
+        last_error = None
+
+        for attempt in range(self.max_attempts):
+            remaining = deadline_at - time.monotonic()
+            if attempt:
+                delay = self.backoff(attempt)
+                if remaining - delay < self.MIN_ATTEMPT_SECONDS:
+                    raise DeadlineExceeded(f"no answer within {self.deadline:.0f}s ({_describe(last_error)})")
+                print(f"   ⚠️  Attempt {attempt} failed ({_describe(last_error)}), retrying in {delay:.1f}s")
+                if cancel_event is None:
+                    time.sleep(delay)
+                elif cancel_event.wait(delay):
+                    break
+                remaining = deadline_at - time.monotonic()
+
+            started = time.monotonic()
+            try:
+                response = send(self.timeout(remaining))
+            except requests.exceptions.ReadTimeout as e:
+                last_error = e
+                if deadline_at - time.monotonic() < self.read_timeout():
+                    raise DeadlineExceeded(f"no answer within {self.deadline:.0f}s (ReadTimeout, "
+                                           f"too little time left to retry)") from e
+                continue
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                last_error = e
+                continue
+            if response.status_code in RETRY_STATUSES:
+                last_error = response
+                continue
+            if response.status_code < 400:
+                self.observe(time.monotonic() - started)
+            return response
+
+        if isinstance(last_error, requests.Response):
+            return last_error
+        if isinstance(last_error, requests.exceptions.Timeout) and time.monotonic() >= deadline_at:
+            raise DeadlineExceeded(f"no answer within {self.deadline:.0f}s") from last_error
+        raise last_error
+
+
+def _describe(error):
+    if isinstance(error, requests.Response):
+        return f"HTTP {error.status_code}"
+    return type(error).__name__
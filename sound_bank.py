@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Preloaded UI cue sounds on dedicated mixer channels
+"""
+
+import os
+
+import numpy as np
+import pygame
+
+from playback import PlaybackController
+
+UI_CUES = ("start.wav", "ending.wav", "error.wav", "medication_reminder.wav", "waiting.wav")
+
+# Mixer channel layout: 0 streams responses, 1 loops, 2 one-shot cues
+RESPONSE_CHANNEL = 0
+LOOP_CHANNEL = 1
+CUE_CHANNEL = 2
+NUM_CHANNELS = 3
+
+
+class SoundBank:
+    """Decodes each cue once into a pygame Sound and plays it from memory"""
+
+    def __init__(self, sounds_dir, playback=None, cues=UI_CUES):
+        self.sounds_dir = sounds_dir
+        self.sounds = {}
+        self.resampled = {}  # (name, rate) -> mono float32 samples
+        self.cues = cues
+        self.playback = playback or PlaybackController()
+
+        pygame.mixer.set_num_channels(NUM_CHANNELS)
+        pygame.mixer.set_reserved(NUM_CHANNELS)  # Keep Sound.play() off our channels
+
+    def preload(self):
+        """Decode all cues up front; missing files are reported and skipped"""
+        loaded = [name for name in self.cues if self.get(name) is not None]
+        print(f"✓ Sound bank ready ({len(loaded)}/{len(self.cues)} cues)")
+
+    def get(self, name):
+        """Cached Sound for a cue file, decoding it on first use"""
+        sound = self.sounds.get(name)
+        if sound is None:
+            path = os.path.join(self.sounds_dir, name)
+            if not os.path.exists(path):
+                print(f"✗ Sound not found: {name}")
+                return None
+            sound = pygame.mixer.Sound(path)
+            self.sounds[name] = sound
+        return sound
+
+    def release(self):
+        """Drop every decoded cue; each is decoded again on its next use"""
+        self.sounds.clear()
+        self.resampled.clear()
+
+    def is_loaded(self):
+        return bool(self.sounds or self.resampled)
+
+    def samples(self, name, rate):
+        """Mono float32 samples of a cue at `rate` (for cancelling it from the mic)"""
+        key = (name, rate)
+        if key not in self.resampled:
+            sound = self.get(name)
+            mix_rate, size, channels = pygame.mixer.get_init()
+            if sound is None or size != -16:
+                return None
+            raw = np.frombuffer(sound.get_raw(), dtype=np.int16).reshape(-1, channels).mean(axis=1)
+            times = np.arange(int(len(raw) * rate / mix_rate)) * mix_rate / rate
+            self.resampled[key] = np.interp(times, np.arange(len(raw)), raw).astype(np.float32)
+        return self.resampled[key]
+
+    def play(self, name, loop=False, blocking=True):
+        """Play a cue; loops run on their own channel until stop_loop()"""
+        sound = self.get(name)
+        if sound is None:
+            return
+
+        if loop:
+            self.playback.play(LOOP_CHANNEL, sound, loops=-1)
+            return
+
+        self.playback.play(CUE_CHANNEL, sound)
+        if blocking:
+            self.playback.wait(CUE_CHANNEL)
+
+    def stop_loop(self):
+        """Stop the looped cue"""
+        self.playback.stop(LOOP_CHANNEL)
+
+    def stop(self):
+        """Stop every cue"""
+        self.playback.stop(CUE_CHANNEL)
+        self.playback.stop(LOOP_CHANNEL)
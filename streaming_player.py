@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Streaming playback of WAV responses while they download
+"""
+
+import time
+import queue
+import struct
+import threading
+
+import numpy as np
+import pygame
+
+
+class UnsupportedAudioFormat(Exception):
+    """Response is not 16-bit PCM WAV; `prefix` holds the bytes already read"""
+
+    def __init__(self, message, prefix):
+        super().__init__(message)
+        self.prefix = prefix
+
+
+def parse_wav_header(chunks):
+    """Read chunks until the WAV data section starts
+
+    Returns (channels, sample_rate, sample_width, leftover_data, prefix).
+    Raises UnsupportedAudioFormat for anything but 16-bit PCM WAV.
+    """
+    prefix = b''
+    for chunk in chunks:
+        prefix += chunk
+        if len(prefix) < 12:
+            continue
+        if prefix[:4] != b'RIFF' or prefix[8:12] != b'WAVE':
+            raise UnsupportedAudioFormat("not a RIFF/WAVE stream", prefix)
+
+        fmt = None
+        offset = 12
+        while offset + 8 <= len(prefix):
+            chunk_id, size = struct.unpack_from('<4sI', prefix, offset)
+            body = offset + 8
+            if chunk_id == b'data':
+                if fmt is None:
+                    raise UnsupportedAudioFormat("data before fmt chunk", prefix)
+                audio_format, channels, rate, _, _, bits = fmt
+                if audio_format != 1 or bits != 16:
+                    raise UnsupportedAudioFormat(f"format {audio_format}, {bits}-bit", prefix)
+                return channels, rate, 2, prefix[body:], prefix
+            if body + size > len(prefix):
+                break  # Need more bytes for this chunk
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack_from('<HHIIHH', prefix, body)
+            offset = body + size + (size & 1)
+
+        if len(prefix) > 65536:
+            raise UnsupportedAudioFormat("no data chunk in header", prefix)
+
+    raise UnsupportedAudioFormat("stream ended inside the header", prefix)
+
+
+class LinearResampler:
+    """Stateful linear-interpolation resampler for float32 frames (n, channels)"""
+
+    def __init__(self, src_rate, dst_rate):
+        self.step = src_rate / dst_rate
+        self.position = 0.0
+        self.tail = None
+
+    def process(self, frames):
+        if self.step == 1.0:
+            return frames
+        if self.tail is not None:
+            frames = np.concatenate([self.tail, frames])
+        if len(frames) < 2:
+            self.tail = frames
+            return frames[:0]
+
+        positions = np.arange(self.position, len(frames) - 1, self.step)
+        base = positions.astype(np.int64)
+        weight = (positions - base)[:, None]
+        out = frames[base] * (1.0 - weight) + frames[base + 1] * weight
+
+        self.position = positions[-1] + self.step - (len(frames) - 1)
+        self.tail = frames[-1:]
+        return out
+
+
+class StreamingPlayer:
+    """Plays a downloading WAV through a pygame mixer channel
+
+    Audio is converted to the mixer format in ~100 ms segments and held in a
+    bounded jitter buffer. Playback starts once `prebuffer_ms` has arrived;
+    the download blocks while the buffer is full. Whenever the buffer runs dry
+    before the download is done and the channel goes silent, or a queued
+    segment is lost because the mixer never started it, an underrun is
+    counted.
+    """
+
+    POLL_S = 0.005  # Channel state checks once a segment is due to start
+    MIXER_GRACE_S = 0.5  # How late the mixer may be before a segment counts as dropped
+
+    def __init__(self, channel_id=0, prebuffer_ms=300, max_buffer_ms=3000, segment_ms=100):
+        self.channel_id = channel_id
+        self.prebuffer_segments = max(1, prebuffer_ms // segment_ms)
+        self.segment_ms = segment_ms
+        self.max_segments = max(self.prebuffer_segments, max_buffer_ms // segment_ms)
+        self.total_underruns = 0
+        self.last_underrun_time = None  # time.time()
+        self.last_stats = None
+        self.stop_event = threading.Event()
+
+    def play(self, chunks):
+        """Play an iterable of response byte chunks; blocks until playback ends
+
+        Returns a stats dict. Raises UnsupportedAudioFormat before any audio
+        is played if the stream is not 16-bit PCM WAV.
+        """
+        self.stop_event.clear()
+        chunks = iter(chunks)
+        started = time.monotonic()
+        channels, rate, sample_width, leftover, _ = parse_wav_header(chunks)
+
+        mix_rate, _, mix_channels = pygame.mixer.get_init()
+        resampler = LinearResampler(rate, mix_rate)
+        segment_bytes = int(rate * self.segment_ms / 1000) * channels * sample_width
+
+        segments = queue.Queue(maxsize=self.max_segments)
+        stats = {
+            "source": f"{channels}ch, 16bit, {rate}Hz",
+            "first_audio_s": None,
+            "first_audio_at": None,  # time.monotonic() when playback began
+            "underruns": 0,
+            "underrun_times": [],
+            "bytes": len(leftover),
+        }
+        feeder = threading.Thread(
+            target=self._feed, args=(segments, stats, started), daemon=True
+        )
+
+        def to_sound(data):
+            frames = np.frombuffer(data, dtype='<i2').reshape(-1, channels).astype(np.float32)
+            if channels != mix_channels:
+                frames = np.repeat(frames.mean(axis=1, keepdims=True), mix_channels, axis=1)
+            frames = resampler.process(frames)
+            pcm = np.clip(frames, -32768, 32767).astype('<i2').tobytes()
+            return pygame.mixer.Sound(buffer=pcm)
+
+        pending = leftover
+        queued = 0
+        try:
+            for chunk in chunks:
+                if self.stop_event.is_set():
+                    break
+                pending += chunk
+                stats["bytes"] += len(chunk)
+                while len(pending) >= segment_bytes and not self.stop_event.is_set():
+                    self._put(segments, to_sound(pending[:segment_bytes]))
+                    pending = pending[segment_bytes:]
+                    queued += 1
+                    if queued == self.prebuffer_segments:
+                        feeder.start()
+
+            usable = len(pending) - len(pending) % (channels * sample_width)
+            if usable and not self.stop_event.is_set():
+                self._put(segments, to_sound(pending[:usable]))
+        finally:
+            if feeder.ident is None:
+                feeder.start()
+            self._put(segments, None, force=True)
+            feeder.join()
+
+        self.last_stats = stats
+        return stats
+
+    def stop(self):
+        """Abort the current playback and download"""
+        self.stop_event.set()
+        pygame.mixer.Channel(self.channel_id).stop()
+
+    def _put(self, segments, item, force=False):
+        """Queue a segment, waiting for room unless playback was stopped"""
+        while True:
+            try:
+                segments.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                if self.stop_event.is_set():
+                    if not force:
+                        return
+                    # Make room for the end marker
+                    try:
+                        segments.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def _feed(self, segments, stats, started):
+        """Keep the mixer channel supplied from the jitter buffer
+
+        pygame holds a single queued Sound per channel and queue() replaces
+        it, so the next segment is only queued once the channel's queue is
+        empty, i.e. once the mixer has actually moved on. The estimated end
+        times only decide when to start checking.
+        """
+        channel = pygame.mixer.Channel(self.channel_id)
+        play_until = 0.0  # Estimated end of the last segment handed to the mixer
+        queued_start = None  # Estimated start of the segment in the channel's queue
+        ready = []
+
+        while True:
+            if queued_start is not None:
+                if not self._wait_queue_free(channel, queued_start):
+                    if self.stop_event.is_set():
+                        break
+                    # The mixer never took it; queueing the next one will replace it
+                    self._underrun(stats, "queued segment dropped")
+                queued_start = None
+
+            if not ready:
+                try:
+                    ready.append(segments.get_nowait())
+                except queue.Empty:
+                    ready.append(segments.get())
+                    if ready[0] is not None and not channel.get_busy():
+                        self._underrun(stats, "buffer ran dry")
+                        # Rebuffer before resuming so playback doesn't stutter
+                        while len(ready) < self.prebuffer_segments and ready[-1] is not None:
+                            ready.append(segments.get())
+
+            sound = ready.pop(0)
+            if sound is None or self.stop_event.is_set():
+                break
+
+            now = time.monotonic()
+            if not channel.get_busy():
+                channel.play(sound)
+                play_until = now + sound.get_length()
+                if stats["first_audio_s"] is None:
+                    stats["first_audio_s"] = now - started
+                    stats["first_audio_at"] = now
+            else:
+                channel.queue(sound)
+                queued_start = max(play_until, now)
+                play_until = queued_start + sound.get_length()
+
+        # Wake when the estimated end is reached, then confirm with the channel
+        if not self.stop_event.is_set():
+            self.stop_event.wait(max(0.0, play_until - time.monotonic()))
+            limit = time.monotonic() + self.MIXER_GRACE_S
+            while channel.get_busy() and time.monotonic() < limit and not self.stop_event.is_set():
+                self.stop_event.wait(self.POLL_S)
+        if self.stop_event.is_set():
+            channel.stop()
+
+    def _wait_queue_free(self, channel, queued_start):
+        """Wait for the mixer to start the queued segment; False if stopped or it never did"""
+        self.stop_event.wait(max(0.0, queued_start - time.monotonic()))
+        limit = max(queued_start, time.monotonic()) + self.MIXER_GRACE_S
+        while channel.get_queue() is not None:
+            if self.stop_event.is_set() or time.monotonic() >= limit:
+                return False
+            self.stop_event.wait(self.POLL_S)
+        return not self.stop_event.is_set()
+
+    def _underrun(self, stats, reason):
+        stats["underruns"] += 1
+        stats["underrun_times"].append(time.time())
+        self.total_underruns += 1
+        self.last_underrun_time = stats["underrun_times"][-1]
+        print(f"⚠️  Playback underrun #{stats['underruns']} ({reason})")
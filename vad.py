@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Voice activity endpointing for recordings
+"""
+
+import numpy as np
+
+
+class VoiceActivityEndpointer:
+    """Energy / zero-crossing endpointer that decides when the speaker is done
+
+    Audio is scored in fixed frames (20 ms by default) with numpy, so a whole
+    chunk - or a whole clip - is scored in one vectorized pass. Recording ends
+    once speech has been heard and is followed by `trailing_silence_ms` of
+    non-speech, when nobody speaks for `no_speech_timeout_ms`, or at
+    `max_duration_ms` no matter what.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=20, trailing_silence_ms=800,
+                 max_duration_ms=8000, min_speech_ms=120, no_speech_timeout_ms=5000,
+                 speech_margin_db=10.0, min_floor_db=-60.0):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.frame_ms = frame_ms
+        self.trailing_silence_frames = max(1, trailing_silence_ms // frame_ms)
+        self.max_frames = max(1, max_duration_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.no_speech_frames = max(1, no_speech_timeout_ms // frame_ms)
+        self.speech_margin_db = speech_margin_db
+        self.min_floor_db = min_floor_db
+        self.reset()
+
+    def reset(self):
+        """Forget all state before a new recording"""
+        self.noise_floor_db = None
+        self.frames_seen = 0
+        self.speech_frames = 0
+        self.silence_run = 0
+        self.speech_started = False
+        self.done = False
+        self.reason = None
+        self._pending = b''
+
+    def calibrate(self, pcm):
+        """Seed the noise floor from background audio (e.g. before the wake word)"""
+        usable = len(pcm) - len(pcm) % (self.frame_length * 2)
+        if not usable:
+            return
+        samples = np.frombuffer(bytes(pcm[:usable]), dtype='<i2')
+        self.noise_floor_db = None
+        self.score_frames(samples)
+
+    def score_frames(self, samples):
+        """Return (energy dBFS, zero-crossing rate, is_speech) for each frame
+
+        `samples` is an int16 array whose length is a multiple of the frame
+        length. Everything is computed for all frames at once.
+        """
+        frames = samples.reshape(-1, self.frame_length).astype(np.float32)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1)) / 32768.0
+        energy_db = 20.0 * np.log10(np.maximum(rms, 1e-6))
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame_length
+
+        if self.noise_floor_db is None:
+            # Seed the floor from the quietest part of the first chunk
+            self.noise_floor_db = max(float(np.percentile(energy_db, 10)), self.min_floor_db)
+
+        threshold = self.noise_floor_db + self.speech_margin_db
+        voiced = energy_db > threshold
+        # Quieter fricatives ("s", "sh") have a high zero-crossing rate
+        fricative = (energy_db > threshold - self.speech_margin_db / 2) & (zcr > 0.25) & (zcr < 0.6)
+        return energy_db, zcr, voiced | fricative
+
+    def process(self, pcm):
+        """Feed raw 16-bit PCM bytes; returns True once the endpoint is reached"""
+        if self.done:
+            return True
+
+        data = self._pending + bytes(pcm)
+        usable = len(data) - len(data) % (self.frame_length * 2)
+        self._pending = data[usable:]
+        if not usable:
+            return False
+
+        samples = np.frombuffer(data[:usable], dtype='<i2')
+        energy_db, _, is_speech = self.score_frames(samples)
+
+        for energy, speech in zip(energy_db.tolist(), is_speech.tolist()):
+            self.frames_seen += 1
+
+            if speech:
+                self.speech_frames += 1
+                self.silence_run = 0
+                if self.speech_frames >= self.min_speech_frames:
+                    self.speech_started = True
+            else:
+                self.silence_run += 1
+                if not self.speech_started:
+                    self.speech_frames = 0
+                # Track the background level on non-speech frames only
+                self.noise_floor_db = max(
+                    min(self.noise_floor_db * 0.95 + energy * 0.05, energy + 3.0),
+                    self.min_floor_db
+                )
+
+            if self.speech_started and self.silence_run >= self.trailing_silence_frames:
+                self.reason = "trailing_silence"
+            elif not self.speech_started and self.frames_seen >= self.no_speech_frames:
+                self.reason = "no_speech"
+            elif self.frames_seen >= self.max_frames:
+                self.reason = "max_duration"
+
+            if self.reason:
+                self.done = True
+                return True
+
+        return False
+
+    @property
+    def duration_ms(self):
+        """Audio consumed so far, in milliseconds"""
+        return self.frames_seen * self.frame_ms
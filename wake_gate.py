@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Energy gate in front of the wake word engine, and listening CPU accounting
+"""
+
+import time
+import resource
+from collections import deque
+
+import numpy as np
+
+
+class EnergyGate:
+    """Passes only frames loud enough to possibly hold the wake word
+
+    Each frame's RMS level (dBFS) is compared with an adaptive noise floor.
+    A frame `margin_db` above the floor opens the gate, which then stays
+    open for `hangover_ms` after the last loud frame so the quiet tail of
+    the word still reaches the engine. Porcupine needs the word's onset, so
+    the last `lookback_ms` of frames are replayed when the gate opens.
+    Frames are scored a block at a time in one numpy pass.
+
+    Frames are tagged with their capture position (the byte offset just
+    after them), so a detection can be placed exactly.
+    """
+
+    def __init__(self, frame_length, sample_rate=16000, margin_db=9.0, hangover_ms=600,
+                 lookback_ms=300, min_floor_db=-70.0):
+        frame_ms = frame_length * 1000 / sample_rate
+        self.frame_length = frame_length
+        self.frame_bytes = frame_length * 2
+        self.margin_db = margin_db
+        self.hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self.min_floor_db = min_floor_db
+        self.lookback = deque(maxlen=max(1, round(lookback_ms / frame_ms)))
+        self.noise_floor_db = None
+        self.open_frames = 0  # Frames of hangover left
+        self.frames_seen = 0
+        self.frames_passed = 0
+
+    def restart(self):
+        """Drop the look-back (stale after a conversation); keep the noise floor"""
+        self.lookback.clear()
+        self.open_frames = 0
+
+    def process(self, data, end_position):
+        """Feed whole frames of 16-bit PCM ending at `end_position`
+
+        Returns the (end position, frame) pairs to run the engine on.
+        """
+        samples = np.frombuffer(data, dtype='<i2').reshape(-1, self.frame_length).astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1)) / 32768.0
+        levels = 20.0 * np.log10(np.maximum(rms, 1e-6))
+
+        passed = []
+        start_position = end_position - len(data)
+        for index, level in enumerate(levels.tolist()):
+            frame_end = (index + 1) * self.frame_bytes
+            frame = (start_position + frame_end, data[frame_end - self.frame_bytes:frame_end])
+            self.frames_seen += 1
+            if self.noise_floor_db is None:
+                self.noise_floor_db = max(level, self.min_floor_db)
+
+            if level > self.noise_floor_db + self.margin_db:
+                if not self.open_frames:
+                    passed.extend(self.lookback)  # Onset of the word
+                    self.lookback.clear()
+                self.open_frames = self.hangover_frames
+            else:
+                # Follow the background on quiet frames: slowly up, quickly down
+                self.noise_floor_db = max(
+                    min(self.noise_floor_db * 0.95 + level * 0.05, level + 3.0),
+                    self.min_floor_db
+                )
+
+            if self.open_frames:
+                self.open_frames -= 1
+                passed.append(frame)
+            else:
+                self.lookback.append(frame)
+
+        self.frames_passed += len(passed)
+        return passed
+
+    @property
+    def pass_ratio(self):
+        """Fraction of frames that reached the engine"""
+        return self.frames_passed / self.frames_seen if self.frames_seen else 1.0
+
+
+class ListeningMeter:
+    """CPU time spent listening for the wake word, per hour of listening"""
+
+    def __init__(self):
+        self.listen_seconds = 0.0
+        self.cpu_seconds = 0.0  # Wake word thread only
+        self._started = None
+
+    def start(self):
+        self._started = (time.monotonic(), time.thread_time())
+
+    def stop(self):
+        if self._started:
+            wall, cpu = self._started
+            self.listen_seconds += time.monotonic() - wall
+            self.cpu_seconds += time.thread_time() - cpu
+            self._started = None
+
+    def cpu_per_hour(self):
+        """Seconds of CPU per hour spent listening"""
+        if not self.listen_seconds:
+            return 0.0
+        return self.cpu_seconds / self.listen_seconds * 3600
+
+
+def process_cpu_seconds():
+    """User + system CPU of the whole process (all threads)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime